@@ -0,0 +1,53 @@
+import io
+import os
+import re
+import time
+
+from ocr_engine import get_ocr_engine
+from ocr_cache import get_ocr_cache, content_key
+
+# 12-digit Aadhar number as printed on the card
+AADHAR_PATTERN = re.compile(r'\d{4} \d{4} \d{4}')
+
+# Crop to the number band before OCR (falls back to the full card if nothing matches)
+AADHAR_CROP = os.environ.get("AADHAR_CROP", "0") == "1"
+
+def _ocr(pixels, timings, stage):
+    start = time.perf_counter()
+    text = get_ocr_engine().readtext(pixels, detail=0)
+    timings[stage] = time.perf_counter() - start
+    return text, any(AADHAR_PATTERN.match(t) for t in text)
+
+def _no_progress(stage, fraction):
+    pass
+
+def read_aadhar(image_bytes, image=None, crop=AADHAR_CROP, progress=_no_progress):
+    # Imaging libraries load on the first verification, not at page start
+    from PIL import Image
+    from image_preprocess import preprocess_for_ocr, MAX_OCR_SIDE, AADHAR_NUMBER_BOX
+    progress('preparing image', 0.1)
+    if image is None:
+        image = Image.open(io.BytesIO(image_bytes))
+    crop_box = AADHAR_NUMBER_BOX if crop else None
+    pixels, timings = preprocess_for_ocr(image, MAX_OCR_SIDE, crop_box)
+    progress('reading text', 0.3)
+    text, verdict = _ocr(pixels, timings, 'ocr')
+    if crop and not verdict:
+        progress('reading the full card', 0.65)
+        pixels, _ = preprocess_for_ocr(Image.open(io.BytesIO(image_bytes)), MAX_OCR_SIDE)
+        text, verdict = _ocr(pixels, timings, 'ocr_full')
+    timings['total'] = sum(timings.values())
+    return {'text': text, 'verdict': verdict, 'timings': timings}
+
+# Verify an Aadhar image, reusing the cached result for identical uploads
+def verify_aadhar_image(image_bytes, image=None, progress=_no_progress):
+    return get_ocr_cache().get_or_compute(image_bytes, lambda data: read_aadhar(data, image, progress=progress), namespace="aadhar")
+
+# Verify an Aadhar image on the background job queue; reruns with the same upload attach to
+# the same job. Raises jobs.QueueFull when too many verifications are already in flight.
+def submit_aadhar_job(image_bytes, retry=False):
+    from jobs import get_job_queue
+    return get_job_queue().submit('aadhar', content_key(image_bytes, "aadhar"), verify_aadhar_image, image_bytes, retry=retry)
+
+def format_timings(timings):
+    return " · ".join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in timings.items())
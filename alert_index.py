@@ -0,0 +1,79 @@
+import os
+import time
+from collections import Counter, OrderedDict
+
+# Most alerts retained per index, oldest dropped first
+ALERT_HISTORY = int(os.environ.get("ALERT_HISTORY", "5000"))
+
+# Alerts older than this many seconds are dropped (0 keeps them until the history cap)
+ALERT_RETENTION = float(os.environ.get("ALERT_RETENTION", "86400"))
+
+# Structured fraud alerts keyed on (txn id, rule) in the order they were raised.
+# Dedup is a dict lookup and history is capped by count and age, so memory stays flat in
+# long-running sessions; an alert is only deduplicated while it is retained.
+# Per-rule counts are kept both for the retained window and for all time.
+class AlertIndex:
+    def __init__(self, max_alerts=ALERT_HISTORY, retention=ALERT_RETENTION):
+        self.max_alerts = max_alerts
+        self.retention = retention
+        self._alerts = OrderedDict()
+        self._counts = Counter()
+        self.totals = Counter()
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self._alerts)
+
+    def __contains__(self, key):
+        return key in self._alerts
+
+    # Record an alert; returns the new alert dict, or None if it is already indexed
+    def add(self, txn_id, rule, severity, message, timestamp=None):
+        key = (txn_id, rule)
+        if key in self._alerts:
+            return None
+        alert = {
+            'txn_id': txn_id,
+            'rule': rule,
+            'severity': severity,
+            'message': message,
+            'timestamp': time.time() if timestamp is None else timestamp,
+        }
+        self._alerts[key] = alert
+        self._counts[rule] += 1
+        self.totals[rule] += 1
+        self.expire(alert['timestamp'])
+        return alert
+
+    def _pop_oldest(self):
+        _, alert = self._alerts.popitem(last=False)
+        self._counts[alert['rule']] -= 1
+        if not self._counts[alert['rule']]:
+            del self._counts[alert['rule']]
+        self.evicted += 1
+
+    def expire(self, now=None):
+        while len(self._alerts) > self.max_alerts:
+            self._pop_oldest()
+        if self.retention:
+            cutoff = (time.time() if now is None else now) - self.retention
+            while self._alerts and next(iter(self._alerts.values()))['timestamp'] < cutoff:
+                self._pop_oldest()
+
+    # Retained alerts per rule
+    def counts(self):
+        return dict(self._counts)
+
+    # Newest alerts first, optionally for one rule only
+    def recent(self, limit=None, rule=None):
+        alerts = []
+        for alert in reversed(self._alerts.values()):
+            if rule is None or alert['rule'] == rule:
+                alerts.append(alert)
+                if limit is not None and len(alerts) >= limit:
+                    break
+        return alerts
+
+    def clear(self):
+        self._alerts.clear()
+        self._counts.clear()
@@ -0,0 +1,39 @@
+import pandas as pd
+import streamlit as st
+
+# Alerts rendered per page of the sidebar
+ALERT_PAGE_SIZE = 20
+
+# Sidebar fraud alerts: per-rule counts plus only the newest alerts, so a rerun renders a
+# fixed number of elements however many alerts the session has raised.
+# With an explainer, alerts whose explanation has arrived since the scan are shown with it.
+def render_alert_panel(index, key="alerts", page_size=ALERT_PAGE_SIZE, explainer=None):
+    sidebar = st.sidebar
+    counts = index.counts()
+    if not counts:
+        sidebar.caption("No fraud alerts yet.")
+        return
+
+    sidebar.dataframe(
+        pd.DataFrame({
+            'rule': list(counts),
+            'alerts': list(counts.values()),
+            'all time': [index.totals[rule] for rule in counts],
+        }).sort_values('alerts', ascending=False),
+        hide_index=True,
+    )
+    rule = sidebar.selectbox("Rule", ['All'] + sorted(counts), key=f'{key}_rule')
+    rule = None if rule == 'All' else rule
+    available = len(index) if rule is None else counts[rule]
+
+    limit_key = f'{key}_limit'
+    if limit_key not in st.session_state:
+        st.session_state[limit_key] = page_size
+    for alert in index.recent(st.session_state[limit_key], rule):
+        text = explainer.lookup(alert['explain_key']) if explainer is not None and 'explain_key' in alert else None
+        sidebar.write(f"{alert['message']}\n\n💡 {text}" if text else alert['message'])
+
+    if st.session_state[limit_key] < available:
+        if sidebar.button(f"Show older alerts ({available - st.session_state[limit_key]} more)", key=f'{key}_more'):
+            st.session_state[limit_key] += page_size
+            st.rerun()
@@ -0,0 +1,307 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+# Trained model file, written by `python anomaly_model.py train`
+ANOMALY_MODEL_PATH = os.environ.get("ANOMALY_MODEL_PATH", "anomaly_model.npz")
+
+# How model verdicts combine with rule alerts: "or" adds model alerts to the rule alerts,
+# "and" keeps rule alerts only where the model agrees, "off" ignores the model
+ANOMALY_COMBINE = os.environ.get("ANOMALY_COMBINE", "or")
+COMBINE_MODES = ('off', 'or', 'and')
+
+# Hit-mask bit used for model alerts; rule sets use the bits below it
+MODEL_BIT = 63
+MODEL_RULE = 'anomaly_model'
+MODEL_SEVERITY = 'medium'
+MODEL_MESSAGE = "🤖 Anomaly: Transaction {id} scored {anomaly_score} on the anomaly model!"
+
+N_TREES = 100
+SAMPLE_SIZE = 256
+CONTAMINATION = 0.02
+
+# Rows scored per pass; bounds the (rows x trees) traversal arrays
+SCORE_CHUNK = 16_384
+
+FEATURES = [
+    'log_amount', 'handle_rarity', 'city_rarity',
+    'log_txn_count_10m', 'log_amount_sum_60m', 'distinct_locations_60m', 'log_travel_speed',
+]
+
+def _average_path(n):
+    # Average path length of an unsuccessful BST search over n points (Liu et al. 2008)
+    n = np.asarray(n, dtype=np.float64)
+    safe = np.maximum(n, 2)
+    c = 2 * (np.log(safe - 1) + np.euler_gamma) - 2 * (safe - 1) / safe
+    return np.where(n > 2, c, np.where(n == 2, 1.0, 0.0))
+
+# Isolation forest in numpy. Trees are stored as padded (trees x nodes) arrays; scoring flattens
+# them so every row walks every tree at once, one gather per tree level, and leaves loop back
+# to themselves so finished paths need no masking.
+class IsolationForest:
+    def __init__(self, feature, threshold, left, right, size, sample_size):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.size = size
+        self.sample_size = sample_size
+        self.depth = int(np.ceil(np.log2(max(sample_size, 2))))
+        self._flatten()
+
+    def _flatten(self):
+        n_trees, n_nodes = self.feature.shape
+        offset = (np.arange(n_trees) * n_nodes)[:, None]
+        nodes = np.arange(n_trees * n_nodes).reshape(n_trees, n_nodes)
+        leaf = self.feature < 0
+        self._roots = offset.ravel().astype(np.int32)
+        self._feature = np.where(leaf, 0, self.feature).ravel().astype(np.int32)
+        self._threshold = np.where(leaf, np.inf, self.threshold).ravel()
+        left = np.where(leaf, nodes, self.left + offset).ravel()
+        right = np.where(leaf, nodes, self.right + offset).ravel()
+        # Children interleaved, so node n continues at _children[2n] (left) or [2n + 1] (right)
+        self._children = np.column_stack([left, right]).ravel().astype(np.int32)
+        # Path length credited on reaching a node: its depth plus the expected depth left unbuilt
+        depth = np.zeros(n_trees * n_nodes)
+        internal = np.flatnonzero(~leaf.ravel())
+        for _ in range(self.depth):
+            depth[left[internal]] = depth[internal] + 1
+            depth[right[internal]] = depth[internal] + 1
+        self._path = depth + _average_path(self.size.ravel())
+
+    @classmethod
+    def fit(cls, X, n_trees=N_TREES, sample_size=SAMPLE_SIZE, seed=0):
+        rng = np.random.default_rng(seed)
+        sample_size = min(sample_size, len(X))
+        max_depth = int(np.ceil(np.log2(max(sample_size, 2))))
+        max_nodes = 2 * sample_size - 1
+        shape = (n_trees, max_nodes)
+        feature = np.full(shape, -1, dtype=np.int32)
+        threshold = np.zeros(shape)
+        left = np.zeros(shape, dtype=np.int32)
+        right = np.zeros(shape, dtype=np.int32)
+        size = np.zeros(shape, dtype=np.int32)
+        for t in range(n_trees):
+            sample = X[rng.choice(len(X), sample_size, replace=False)]
+            count = 1
+            stack = [(0, sample, 0)]
+            while stack:
+                node, rows, depth = stack.pop()
+                size[t, node] = len(rows)
+                if depth >= max_depth or len(rows) <= 1:
+                    continue
+                spread = rows.max(axis=0) - rows.min(axis=0)
+                candidates = np.flatnonzero(spread > 0)
+                if not len(candidates):
+                    continue
+                f = rng.choice(candidates)
+                split = rng.uniform(rows[:, f].min(), rows[:, f].max())
+                goes_left = rows[:, f] < split
+                feature[t, node], threshold[t, node] = f, split
+                left[t, node], right[t, node] = count, count + 1
+                count += 2
+                stack.append((left[t, node], rows[goes_left], depth + 1))
+                stack.append((right[t, node], rows[~goes_left], depth + 1))
+        return cls(feature, threshold, left, right, size, sample_size)
+
+    # Anomaly scores in (0, 1]; higher is more anomalous, about 0.5 and below is normal
+    def score(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        scores = np.empty(len(X))
+        norm = _average_path(self.sample_size)
+        for start in range(0, len(X), SCORE_CHUNK):
+            chunk = X[start:start + SCORE_CHUNK]
+            values = chunk.ravel()
+            base = (np.arange(len(chunk), dtype=np.int32) * chunk.shape[1])[:, None]
+            node = np.broadcast_to(self._roots, (len(chunk), len(self._roots))).copy()
+            for _ in range(self.depth):
+                feature = self._feature.take(node)
+                goes_right = values.take(base + feature) >= self._threshold.take(node)
+                node = self._children.take(2 * node + goes_right)
+            path = self._path.take(node).mean(axis=1)
+            scores[start:start + len(chunk)] = 2 ** (-path / norm)
+        return scores
+
+def _handles(batch):
+    if 'handle' in batch:
+        return batch['handle'].astype(object)
+    return '@' + batch['upi'].fillna('').astype(str).str.rpartition('@')[2].str.lower()
+
+def _column(batch, name):
+    if name not in batch:
+        return np.zeros(len(batch))
+    return pd.to_numeric(batch[name], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+
+def _rarity(values, frequencies, unseen, missing):
+    values = pd.Series(values, dtype=object)
+    rarity = values.map(frequencies).astype(float).fillna(unseen)
+    return rarity.mask(values.isna() | (values == ''), missing).to_numpy()
+
+# Expected rarity of a training value, -sum(p log p): a missing value is encoded as this,
+# so it reads as an ordinary value rather than a never-seen one
+def _typical(rarity):
+    return float(sum(np.exp(-r) * r for r in rarity.values()))
+
+# Anomaly model over amount, handle, city and per-UPI history features. Handles and cities are
+# encoded by how rare they were in training (-log frequency, unseen values rarest, missing
+# values typical), history comes from the velocity and travel columns FraudMonitor adds
+# (zeros when they are absent).
+class AnomalyModel:
+    def __init__(self, forest, handle_rarity, city_rarity, threshold):
+        self.forest = forest
+        self.handle_rarity = handle_rarity
+        self.city_rarity = city_rarity
+        self.threshold = threshold
+        self._unseen_handle = max(handle_rarity.values(), default=0.0) + 1
+        self._unseen_city = max(city_rarity.values(), default=0.0) + 1
+        self._missing_handle = _typical(handle_rarity)
+        self._missing_city = _typical(city_rarity)
+
+    def features(self, batch):
+        city = batch['city'] if 'city' in batch else batch['location'] if 'location' in batch else pd.Series([None] * len(batch))
+        return np.column_stack([
+            np.log1p(np.maximum(_column(batch, 'amount'), 0)),
+            _rarity(_handles(batch), self.handle_rarity, self._unseen_handle, self._missing_handle),
+            _rarity(city, self.city_rarity, self._unseen_city, self._missing_city),
+            np.log1p(_column(batch, 'txn_count_10m')),
+            np.log1p(_column(batch, 'amount_sum_60m')),
+            _column(batch, 'distinct_locations_60m'),
+            np.log1p(_column(batch, 'travel_speed_kmh')),
+        ])
+
+    def score(self, batch):
+        if not len(batch):
+            return np.zeros(0)
+        return self.forest.score(self.features(batch))
+
+    @classmethod
+    def train(cls, batch, n_trees=N_TREES, sample_size=SAMPLE_SIZE, contamination=CONTAMINATION, seed=0):
+        def rarity(values):
+            frequencies = pd.Series(values, dtype=object).value_counts(normalize=True)
+            return {key: float(-np.log(share)) for key, share in frequencies.items()}
+        city = batch['city'] if 'city' in batch else batch['location']
+        model = cls(None, rarity(_handles(batch)), rarity(city), 1.0)
+        X = model.features(batch)
+        model.forest = IsolationForest.fit(X, n_trees, sample_size, seed)
+        model.threshold = float(np.quantile(model.forest.score(X), 1 - contamination))
+        return model
+
+    # Arrays plus a JSON header in one .npz; nothing is unpickled when loading
+    def save(self, path=ANOMALY_MODEL_PATH):
+        meta = {
+            'features': FEATURES,
+            'threshold': self.threshold,
+            'sample_size': self.forest.sample_size,
+            'handle_rarity': self.handle_rarity,
+            'city_rarity': self.city_rarity,
+        }
+        with open(path, 'wb') as f:
+            np.savez_compressed(
+                f, meta=np.array(json.dumps(meta)), feature=self.forest.feature, threshold=self.forest.threshold,
+                left=self.forest.left, right=self.forest.right, size=self.forest.size,
+            )
+
+    @classmethod
+    def load(cls, path=ANOMALY_MODEL_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta['features'] != FEATURES:
+                raise ValueError(f"{path} was trained on different features: {meta['features']}")
+            forest = IsolationForest(data['feature'], data['threshold'], data['left'], data['right'], data['size'], meta['sample_size'])
+        return cls(forest, meta['handle_rarity'], meta['city_rarity'], meta['threshold'])
+
+def format_anomaly(record):
+    fields = defaultdict(str, record)
+    return MODEL_MESSAGE.format_map(fields)
+
+_models = {}
+_models_lock = threading.Lock()
+
+# Model loaded once per process and path; None when no model has been trained
+def get_anomaly_model(path=ANOMALY_MODEL_PATH):
+    if not os.path.exists(path):
+        return None
+    with _models_lock:
+        if path not in _models:
+            _models[path] = AnomalyModel.load(path)
+        return _models[path]
+
+# Replay transactions in time order through the same enrichment FraudMonitor applies
+def history_features(transactions, chunk=10_000):
+    from gazetteer import get_gazetteer
+    from velocity import VelocityTracker
+    from travel import TravelTracker
+
+    if 'created_at' in transactions:
+        transactions = transactions.sort_values('created_at', kind='stable')
+    velocity, travel = VelocityTracker(), TravelTracker()
+    parts = []
+    for start in range(0, len(transactions), chunk):
+        batch = get_gazetteer().annotate(transactions.iloc[start:start + chunk])
+        parts.append(travel.observe(velocity.observe(batch)))
+    return pd.concat(parts) if parts else transactions
+
+def read_transactions(path):
+    return pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+
+def train_main(args):
+    transactions = read_transactions(args.input)
+    start = time.perf_counter()
+    batch = history_features(transactions)
+    model = AnomalyModel.train(batch, args.trees, args.sample_size, args.contamination, args.seed)
+    model.save(args.output)
+    summary = {
+        'rows': len(batch),
+        'seconds': round(time.perf_counter() - start, 2),
+        'threshold': round(model.threshold, 4),
+        'output': args.output,
+    }
+    if 'is_fraud' in batch:
+        # Labelled input (e.g. synthetic_data.py): how the training cut-off separates fraud
+        flagged = model.score(batch) >= model.threshold
+        fraud = batch['is_fraud'].to_numpy(dtype=bool)
+        summary['precision'] = round(float((flagged & fraud).sum() / max(flagged.sum(), 1)), 3)
+        summary['recall'] = round(float((flagged & fraud).sum() / max(fraud.sum(), 1)), 3)
+    json.dump(summary, sys.stdout, indent=2)
+    print()
+
+def bench_main(args):
+    from benchmark import measure
+    from synthetic_data import generate_transactions
+
+    model = AnomalyModel.load(args.model) if args.model else AnomalyModel.train(
+        history_features(generate_transactions(50_000, seed=1)))
+    batch = history_features(generate_transactions(max(args.sizes), seed=2))
+    for rows in args.sizes:
+        rows_batch = batch.iloc[:rows]
+        result = measure('anomaly_score', rows, lambda: model.score(rows_batch), args.repeats)
+        print(f"{result['bench']:>14} {rows:>10}  {result['throughput_rows_per_sec']:>12,.0f} rows/s  "
+              f"p50 {result['latency_p50_ms']:.3f} ms  p99 {result['latency_p99_ms']:.3f} ms  "
+              f"peak {result['peak_memory_mb']:.1f} MB")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train or benchmark the transaction anomaly model")
+    commands = parser.add_subparsers(dest="command", required=True)
+    train = commands.add_parser("train", help="fit the model on a CSV or Parquet file of transactions")
+    train.add_argument("input")
+    train.add_argument("--output", default=ANOMALY_MODEL_PATH)
+    train.add_argument("--trees", type=int, default=N_TREES)
+    train.add_argument("--sample-size", type=int, default=SAMPLE_SIZE)
+    train.add_argument("--contamination", type=float, default=CONTAMINATION)
+    train.add_argument("--seed", type=int, default=0)
+    bench = commands.add_parser("bench", help="batch scoring throughput and latency")
+    bench.add_argument("--model", help="trained model file (default: train one on synthetic data)")
+    bench.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000, 100_000])
+    bench.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args(argv)
+    train_main(args) if args.command == "train" else bench_main(args)
+
+if __name__ == "__main__":
+    main()
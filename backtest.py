@@ -0,0 +1,169 @@
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; the report then omits peak memory
+    resource = None
+
+from fraud_monitor import FraudMonitor
+from rule_engine import RULES_PATH, get_rules
+from velocity import VelocityTracker
+from travel import TravelTracker
+from fraud_ring import RingTracker
+from anomaly_model import ANOMALY_COMBINE, ANOMALY_MODEL_PATH, COMBINE_MODES, MODEL_BIT, MODEL_RULE, get_anomaly_model
+
+# Rows read and scored per chunk
+CHUNK_SIZE = 50_000
+
+# Label column marking known fraud in the replayed file
+LABEL = 'is_fraud'
+
+# Chunks of a CSV, JSONL or Parquet file; only one chunk is held in memory at a time
+def read_chunks(path, chunk_size=CHUNK_SIZE):
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    elif path.endswith('.jsonl'):
+        yield from pd.read_json(path, lines=True, chunksize=chunk_size)
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+def _labels(chunk, label):
+    values = chunk[label]
+    if values.dtype == object:
+        values = values.astype(str).str.strip().str.lower().isin(['1', 'true', 'yes'])
+    return values.fillna(False).to_numpy(dtype=bool)
+
+# Running confusion counts for the whole rule set and for each rule on its own
+class Backtest:
+    def __init__(self, names):
+        self.names = names
+        self.rows = 0
+        self.fraud = 0
+        self.flagged = 0
+        self.caught = 0
+        self.rule_flagged = np.zeros(len(names), dtype=np.int64)
+        self.rule_caught = np.zeros(len(names), dtype=np.int64)
+
+    def add(self, masks, labels, bits):
+        flagged = masks != 0
+        self.rows += len(masks)
+        self.fraud += int(labels.sum())
+        self.flagged += int(flagged.sum())
+        self.caught += int((flagged & labels).sum())
+        for i, bit in enumerate(bits):
+            hit = (masks >> np.uint64(bit) & np.uint64(1)).astype(bool)
+            self.rule_flagged[i] += int(hit.sum())
+            self.rule_caught[i] += int((hit & labels).sum())
+
+    def _scores(self, flagged, caught):
+        return {
+            'alerts': int(flagged),
+            'alert_rate': round(flagged / self.rows, 6) if self.rows else 0.0,
+            'precision': round(caught / flagged, 4) if flagged else None,
+            'recall': round(caught / self.fraud, 4) if self.fraud else None,
+        }
+
+    def report(self):
+        return {
+            'rows': self.rows,
+            'fraud': self.fraud,
+            **self._scores(self.flagged, self.caught),
+            'rules': {
+                name: self._scores(flagged, caught)
+                for name, flagged, caught in zip(self.names, self.rule_flagged, self.rule_caught)
+            },
+        }
+
+# Replay a labelled transaction file through the live detection logic. Chunks go through the
+# same FraudMonitor.score the dashboards use (gazetteer, velocity, travel, rules, model), in
+# file order; with --speed the replay is paced by the transactions' created_at timestamps.
+# Memory stays flat: one chunk at a time, and the velocity and travel state are bounded.
+def replay(args):
+    model = get_anomaly_model(args.model) if args.model else None
+    monitor = FraudMonitor(
+        args.rules,
+        velocity=VelocityTracker(),
+        travel=TravelTracker(),
+        rings=RingTracker() if args.rings else None,
+        model=model,
+        combine=args.combine,
+    )
+    rules = get_rules(args.rules)
+    names, bits = list(rules.names), list(range(len(rules.names)))
+    if model is not None and args.combine == 'or':
+        names.append(MODEL_RULE)
+        bits.append(MODEL_BIT)
+    backtest = Backtest(names)
+
+    started = time.perf_counter()
+    first_ts = None
+    scoring = 0.0
+    for chunk in read_chunks(args.input, args.chunk_size):
+        if args.label not in chunk:
+            raise SystemExit(f"{args.input} has no {args.label!r} label column")
+        labels = _labels(chunk, args.label)
+        chunk = chunk.drop(columns=[args.label])
+        if 'id' not in chunk and 'seq' not in chunk:
+            # Alert text needs a transaction id; number the file's rows like store seqs
+            chunk = chunk.assign(seq=np.arange(backtest.rows + 1, backtest.rows + len(chunk) + 1))
+        if args.speed and 'created_at' in chunk and len(chunk):
+            # Time-scaled replay: wait until the chunk's first transaction is due
+            ts = float(chunk['created_at'].iat[0])
+            first_ts = ts if first_ts is None else first_ts
+            delay = (ts - first_ts) / args.speed - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+        start = time.perf_counter()
+        masks, _ = monitor.score(chunk)
+        scoring += time.perf_counter() - start
+        backtest.add(masks, labels, bits)
+        if args.progress:
+            print(f"{backtest.rows:,} rows, {backtest.flagged:,} alerts", file=sys.stderr)
+
+    elapsed = time.perf_counter() - started
+    report = backtest.report()
+    report.update({
+        'rules_path': args.rules,
+        'model': args.model if model is not None else None,
+        'seconds': round(elapsed, 3),
+        'rows_per_sec': round(backtest.rows / elapsed) if elapsed else 0,
+        'scoring_rows_per_sec': round(backtest.rows / scoring) if scoring else 0,
+    })
+    if resource is not None:
+        report['peak_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a labelled transaction file through the fraud rules and report precision/recall")
+    parser.add_argument("input", help=".csv, .jsonl or .parquet with a label column")
+    parser.add_argument("--rules", default=RULES_PATH, help="rule set to evaluate (default: the live rules)")
+    parser.add_argument("--label", default=LABEL)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--speed", type=float, default=0,
+                        help="replay at this multiple of real time using created_at (default: as fast as possible)")
+    parser.add_argument("--rings", action="store_true",
+                        help="also run fraud-ring detection (its graph grows with distinct UPI IDs)")
+    parser.add_argument("--model", default=ANOMALY_MODEL_PATH, help="anomaly model file, empty to disable")
+    parser.add_argument("--combine", choices=COMBINE_MODES, default=ANOMALY_COMBINE)
+    parser.add_argument("--progress", action="store_true", help="print running totals per chunk")
+    parser.add_argument("--output", help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = replay(args)
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
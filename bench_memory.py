@@ -0,0 +1,122 @@
+import gc
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+from synthetic_data import generate_transactions
+from transaction_columns import TransactionColumns
+from benchmark import git_commit
+
+DEFAULT_SIZES = [1_000_000, 10_000_000]
+
+# Transactions generated per chunk, so the source data never dominates the measurement
+CHUNK = 1_000_000
+
+# Above this many rows the list of dicts is extrapolated from the largest measured size
+MAX_DICT_ROWS = 2_000_000
+
+def chunks(rows):
+    for i, start in enumerate(range(0, rows, CHUNK)):
+        chunk = generate_transactions(min(CHUNK, rows - start), seed=i)
+        yield chunk.drop(columns=['is_fraud', 'created_at'])
+
+def build_dicts(rows):
+    transactions = []
+    for chunk in chunks(rows):
+        # The dashboards' original shape: one dict per transaction with a TXN string id
+        chunk['id'] = [f"TXN{len(transactions) + i + 1}" for i in range(len(chunk))]
+        transactions.extend(chunk.to_dict('records'))
+    return transactions
+
+def build_columns(rows):
+    columns = TransactionColumns()
+    for chunk in chunks(rows):
+        columns.add_many(chunk.drop(columns=['id']))
+    return columns
+
+# Memory still allocated once the structure is built and the source chunks are freed
+def traced(build, rows):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = build(rows)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return data, current, elapsed
+
+def frame_ms(read):
+    start = time.perf_counter()
+    read()
+    return (time.perf_counter() - start) * 1000
+
+def bench(rows, max_dict_rows, dict_bytes_per_row=None):
+    import pandas as pd
+
+    results = []
+    if rows <= max_dict_rows:
+        transactions, current, elapsed = traced(build_dicts, rows)
+        results.append({
+            'representation': 'list_of_dicts',
+            'rows': rows,
+            'memory_mb': current / 2 ** 20,
+            'bytes_per_row': current / rows,
+            'build_s': elapsed,
+            'frame_ms': frame_ms(lambda: pd.DataFrame.from_records(transactions)),
+            'estimated': False,
+        })
+        del transactions
+    elif dict_bytes_per_row:
+        results.append({
+            'representation': 'list_of_dicts',
+            'rows': rows,
+            'memory_mb': dict_bytes_per_row * rows / 2 ** 20,
+            'bytes_per_row': dict_bytes_per_row,
+            'build_s': None,
+            'frame_ms': None,
+            'estimated': True,
+        })
+
+    columns, current, elapsed = traced(build_columns, rows)
+    results.append({
+        'representation': 'columnar',
+        'rows': rows,
+        'memory_mb': current / 2 ** 20,
+        'bytes_per_row': current / rows,
+        'array_bytes_per_row': columns.nbytes() / rows,
+        'build_s': elapsed,
+        'frame_ms': frame_ms(lambda: columns.since(0)),
+        'estimated': False,
+    })
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare transaction memory use: list of dicts vs columnar arrays")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--max-dict-rows", type=int, default=MAX_DICT_ROWS,
+                        help="largest list of dicts actually built; bigger sizes are extrapolated")
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    dict_bytes_per_row = None
+    for rows in sorted(args.sizes):
+        for result in bench(rows, args.max_dict_rows, dict_bytes_per_row):
+            if result['representation'] == 'list_of_dicts' and not result['estimated']:
+                dict_bytes_per_row = result['bytes_per_row']
+            results.append(result)
+            frame = "n/a" if result['frame_ms'] is None else f"{result['frame_ms']:.1f} ms"
+            print(f"{result['representation']:>14} {rows:>11,}  {result['memory_mb']:>9,.1f} MB  "
+                  f"{result['bytes_per_row']:>6.1f} B/row  frame {frame}"
+                  f"{'  (estimated)' if result['estimated'] else ''}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({'commit': git_commit(), 'timestamp': time.time(), 'results': results}, f, indent=2)
+        print(f"results written to {args.output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import io
+import os
+import sys
+import json
+import tarfile
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+SCRIPTS = ['s4.py', 's5.py', 's6.py', 's7.py', 's8.py']
+
+# Runs in a fresh interpreter: import Streamlit's test harness, then time the first script run
+CHILD = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=300).run()
+elapsed = time.perf_counter() - start
+print(json.dumps({'first_render_s': elapsed, 'exception': [e.message for e in at.exception]}))
+"""
+
+def extract(ref, into):
+    archive = subprocess.run(["git", "archive", "--format=tar", ref], capture_output=True, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(into)
+    return into
+
+def time_first_render(tree, script, runs, scratch):
+    env = dict(os.environ)
+    env.update({
+        'TRANSACTIONS_DB': os.path.join(scratch, 'transactions.db'),
+        'METRICS_FILE': os.path.join(scratch, 'metrics.prom'),
+    })
+    samples = []
+    errors = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", CHILD, script], cwd=tree, env=env, capture_output=True, text=True)
+        if out.returncode != 0:
+            errors.append(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else f"exit {out.returncode}")
+            continue
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        samples.append(result['first_render_s'])
+        errors.extend(result['exception'])
+    return {
+        'script': script,
+        'runs': len(samples),
+        'median_s': statistics.median(samples) if samples else None,
+        'min_s': min(samples) if samples else None,
+        'errors': sorted(set(errors)),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time-to-first-render of each dashboard in a cold interpreter")
+    parser.add_argument("--scripts", nargs="+", default=SCRIPTS)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--baseline", help="git ref to measure for comparison, e.g. HEAD~1")
+    parser.add_argument("--output", default="startup-benchmark.json")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        trees = {'current': os.getcwd()}
+        if args.baseline:
+            trees[args.baseline] = extract(args.baseline, os.path.join(scratch, "baseline"))
+        for label, tree in trees.items():
+            results[label] = []
+            for script in args.scripts:
+                result = time_first_render(tree, script, args.runs, scratch)
+                results[label].append(result)
+                median = f"{result['median_s']:.3f}s" if result['median_s'] is not None else "failed"
+                print(f"{label:>12} {script:>6}  first render {median}  {'; '.join(result['errors'])}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {args.output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
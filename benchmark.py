@@ -0,0 +1,168 @@
+import io
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from synthetic_data import generate_transactions, generate_kyc
+from upi import is_valid_upi, validate_upi_bulk
+from kyc import is_valid_pan, is_valid_gstin, validate_pan_bulk, validate_gstin_bulk
+from fraud_monitor import FraudMonitor
+from gazetteer import get_gazetteer
+from travel import TravelTracker
+from fraud_ring import RingTracker
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+# Per-item functions are timed call by call on at most this many rows
+SCALAR_SAMPLE = 20_000
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def measure(name, rows, run, repeats):
+    # First run under tracemalloc for peak memory, then timed repeats without it
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        durations.append(time.perf_counter() - start)
+    durations = np.array(durations)
+    return {
+        'bench': name,
+        'rows': rows,
+        'throughput_rows_per_sec': rows / durations.mean(),
+        'latency_p50_ms': float(np.percentile(durations, 50) * 1000),
+        'latency_p99_ms': float(np.percentile(durations, 99) * 1000),
+        'peak_memory_mb': peak / 2 ** 20,
+    }
+
+def measure_scalar(name, rows, fn, values):
+    # Per-call latency percentiles on a sample, throughput over the sample
+    sample = values[:SCALAR_SAMPLE]
+    latencies = np.empty(len(sample))
+    for i, value in enumerate(sample):
+        start = time.perf_counter_ns()
+        fn(value)
+        latencies[i] = time.perf_counter_ns() - start
+    return {
+        'bench': name,
+        'rows': rows,
+        'throughput_rows_per_sec': len(sample) / (latencies.sum() / 1e9),
+        'latency_p50_ms': float(np.percentile(latencies, 50) / 1e6),
+        'latency_p99_ms': float(np.percentile(latencies, 99) / 1e6),
+        'peak_memory_mb': 0.0,
+    }
+
+def bench_transactions(rows, repeats):
+    txns = generate_transactions(rows, seed=rows)
+    records = txns.drop(columns=['is_fraud']).to_dict('records')
+    upis = txns['upi'].tolist()
+    located = get_gazetteer().annotate(txns)
+
+    def monitor():
+        FraudMonitor().run(records)
+
+    return [
+        measure_scalar('is_valid_upi', rows, is_valid_upi, upis),
+        measure('validate_upi_bulk', rows, lambda: validate_upi_bulk(upis), repeats),
+        measure('resolve_locations', rows, lambda: get_gazetteer().resolve(txns['location']), repeats),
+        measure('impossible_travel', rows, lambda: TravelTracker().observe(located), repeats),
+        measure('fraud_rings', rows, lambda: RingTracker().observe(txns), repeats),
+        measure('monitor_fraud', rows, monitor, repeats),
+        measure('report_dataframe', rows, lambda: pd.DataFrame(records), repeats),
+    ]
+
+def bench_kyc(rows, repeats):
+    records = generate_kyc(rows, seed=rows)
+    pans = records['pan'].tolist()
+    gstins = records['gstin'].tolist()
+    return [
+        measure_scalar('is_valid_pan', rows, is_valid_pan, pans),
+        measure_scalar('is_valid_gstin', rows, is_valid_gstin, gstins),
+        measure('validate_pan_bulk', rows, lambda: validate_pan_bulk(pans), repeats),
+        measure('validate_gstin_bulk', rows, lambda: validate_gstin_bulk(gstins), repeats),
+    ]
+
+def synthetic_aadhar(width=3000, height=1900):
+    from PIL import Image, ImageDraw, ImageFont
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default(size=height // 12)
+    draw.text((width // 4, int(height * 0.7)), "1234 5678 9012", fill="black", font=font)
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+def bench_ocr(repeats):
+    try:
+        from aadhar import read_aadhar
+        from ocr_engine import get_ocr_engine
+    except ImportError as e:
+        print(f"skipping OCR benchmark: {e}", file=sys.stderr)
+        return []
+    image_bytes = synthetic_aadhar()
+    start = time.perf_counter()
+    get_ocr_engine()
+    load = time.perf_counter() - start
+    result = measure('ocr_aadhar', 1, lambda: read_aadhar(image_bytes), repeats)
+    result['model_load_ms'] = load * 1000
+    return [result]
+
+def compare(results, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r['bench'], r['rows']): r for r in json.load(f)['results']}
+    for r in results:
+        old = baseline.get((r['bench'], r['rows']))
+        if old:
+            ratio = r['throughput_rows_per_sec'] / old['throughput_rows_per_sec']
+            print(f"{r['bench']:>22} {r['rows']:>10}  {ratio:6.2f}x throughput vs baseline")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark UPI, KYC, fraud monitor, report and OCR paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--ocr", action="store_true", help="also benchmark the Aadhar OCR path")
+    parser.add_argument("--output", help="JSON results file (default: benchmark-<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare throughput against")
+    args = parser.parse_args(argv)
+
+    commit = git_commit()
+    results = []
+    for rows in args.sizes:
+        for result in bench_transactions(rows, args.repeats) + bench_kyc(rows, args.repeats):
+            results.append(result)
+            print(f"{result['bench']:>22} {rows:>10}  {result['throughput_rows_per_sec']:>14,.0f} rows/s  "
+                  f"p50 {result['latency_p50_ms']:.3f} ms  p99 {result['latency_p99_ms']:.3f} ms  "
+                  f"peak {result['peak_memory_mb']:.1f} MB")
+    if args.ocr:
+        results.extend(bench_ocr(args.repeats))
+
+    output = args.output or f"benchmark-{commit}.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            'commit': commit,
+            'timestamp': time.time(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'results': results,
+        }, f, indent=2)
+    print(f"results written to {output}", file=sys.stderr)
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
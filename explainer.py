@@ -0,0 +1,323 @@
+import os
+import re
+import sys
+import json
+import math
+import time
+import asyncio
+import hashlib
+import argparse
+import threading
+from collections import OrderedDict
+
+import metrics
+from upi import upi_handle
+
+# Explanation backend: "gemini", "stub" for offline load tests, or empty to disable
+EXPLAIN_BACKEND = os.environ.get("EXPLAIN_BACKEND", "")
+
+# Gemini model used by the "gemini" backend
+EXPLAIN_MODEL = os.environ.get("EXPLAIN_MODEL", "gemini-1.5-flash")
+
+# Maximum number of backend calls in flight at once
+EXPLAIN_CONCURRENCY = int(os.environ.get("EXPLAIN_CONCURRENCY", "4"))
+
+# Distinct alert patterns explained by one backend call
+EXPLAIN_BATCH = int(os.environ.get("EXPLAIN_BATCH", "8"))
+
+# Seconds to wait for explanations before falling back to the rule text
+EXPLAIN_TIMEOUT = float(os.environ.get("EXPLAIN_TIMEOUT", "5"))
+
+# Maximum number of explanations kept in memory
+EXPLAIN_CACHE_SIZE = int(os.environ.get("EXPLAIN_CACHE_SIZE", "10000"))
+
+# Simulated response time of the stub backend in seconds
+EXPLAIN_STUB_LATENCY = float(os.environ.get("EXPLAIN_STUB_LATENCY", "0.2"))
+
+PROMPT = (
+    "You review UPI payment fraud alerts for a bank analyst. For each numbered alert pattern "
+    "below, write one short sentence explaining why it looks suspicious. Answer with exactly "
+    "one line per alert, starting with its number.\n\n"
+)
+
+_LINE = re.compile(r"^\s*(\d+)[.):]\s*(.+?)\s*$")
+
+# The parts of an alert that decide its explanation: the rule, the UPI handle, the order
+# of magnitude of the amount and the location. Alerts sharing these share one explanation.
+def alert_pattern(rule, record):
+    amount = record.get('amount')
+    try:
+        amount = float(amount)
+    except (TypeError, ValueError):
+        amount = math.nan
+    band = 10 ** int(math.log10(amount)) if amount >= 1 else 0
+    location = record.get('location')
+    return {
+        'rule': rule,
+        'handle': upi_handle(record['upi']) if isinstance(record.get('upi'), str) else '',
+        'amount_band': band,
+        'location': location.strip().lower() if isinstance(location, str) else '',
+    }
+
+def fingerprint(pattern):
+    return hashlib.sha256(json.dumps(pattern, sort_keys=True).encode()).hexdigest()[:16]
+
+def build_prompt(patterns):
+    lines = [
+        f"{n}. rule: {p['rule']}; amount: at least {p['amount_band']}; "
+        f"handle: {p['handle'] or 'unknown'}; location: {p['location'] or 'unknown'}"
+        for n, p in enumerate(patterns, 1)
+    ]
+    return PROMPT + "\n".join(lines)
+
+# One explanation per pattern from a numbered-line reply, None where a line is missing
+def parse_response(text, count):
+    texts = [None] * count
+    for line in text.splitlines():
+        match = _LINE.match(line)
+        if match and 1 <= int(match.group(1)) <= count:
+            texts[int(match.group(1)) - 1] = match.group(2)
+    return texts
+
+# Gemini backend; google.generativeai is only imported when the backend is created
+class GeminiBackend:
+    name = 'gemini'
+
+    def __init__(self, model=EXPLAIN_MODEL):
+        from gemini import get_genai
+        self.model = get_genai().GenerativeModel(model)
+
+    async def explain(self, patterns):
+        response = await self.model.generate_content_async(build_prompt(patterns))
+        return parse_response(response.text, len(patterns))
+
+# Offline backend with a fixed response time, for tests and load runs without an API key
+class StubBackend:
+    name = 'stub'
+
+    def __init__(self, latency=EXPLAIN_STUB_LATENCY):
+        self.latency = latency
+
+    async def explain(self, patterns):
+        await asyncio.sleep(self.latency)
+        reply = "\n".join(
+            f"{n}. {p['rule'].replace('_', ' ').capitalize()}: payments of {p['amount_band']}+ "
+            f"via {p['handle'] or 'an unknown handle'} from {p['location'] or 'an unknown location'} "
+            "fall outside the account's usual pattern."
+            for n, p in enumerate(patterns, 1)
+        )
+        return parse_response(reply, len(patterns))
+
+BACKENDS = {'gemini': GeminiBackend, 'stub': StubBackend}
+
+# Adds LLM explanations to fraud alerts. Calls run on a private asyncio loop with at most
+# `concurrency` in flight, each covering up to `batch_size` distinct alert patterns.
+# Explanations are cached by pattern fingerprint and a pattern already being explained is
+# never requested twice. submit() only queues the calls and returns the fingerprints, which
+# lookup() resolves once the text has arrived; explain() waits at most `timeout` seconds and
+# returns None for anything not ready by then, which is still cached for later when it arrives.
+class Explainer:
+    def __init__(self, backend, concurrency=EXPLAIN_CONCURRENCY, batch_size=EXPLAIN_BATCH,
+                 timeout=EXPLAIN_TIMEOUT, max_entries=EXPLAIN_CACHE_SIZE):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._tasks = set()
+        self.hits = 0
+        self.misses = 0
+        self.calls = 0
+        self.failures = 0
+        self.fallbacks = 0
+        self._loop = asyncio.new_event_loop()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        threading.Thread(target=self._loop.run_forever, name="explainer", daemon=True).start()
+
+    def _get(self, key):
+        with self._lock:
+            text = self._cache.get(key)
+            if text is not None:
+                self._cache.move_to_end(key)
+            return text
+
+    def _put(self, key, text):
+        with self._lock:
+            self._cache[key] = text
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    async def _call(self, chunk):
+        try:
+            async with self._semaphore:
+                self.calls += 1
+                with metrics.timed('explain_call_seconds', backend=self.backend.name):
+                    texts = await asyncio.wait_for(
+                        self.backend.explain([pattern for _, pattern in chunk]), self.timeout)
+            metrics.inc('explain_calls_total', backend=self.backend.name, outcome='ok')
+        except Exception:
+            self.failures += 1
+            metrics.inc('explain_calls_total', backend=self.backend.name, outcome='error')
+            texts = []
+        for i, (key, _) in enumerate(chunk):
+            text = texts[i] if i < len(texts) else None
+            # Failed patterns are not cached so a later alert retries them
+            if text:
+                self._put(key, text)
+            self._pending.pop(key).set_result(text)
+
+    async def _resolve(self, patterns):
+        waits = []
+        todo = []
+        for key, pattern in patterns.items():
+            future = self._pending.get(key)
+            if future is None:
+                future = self._pending[key] = self._loop.create_future()
+                todo.append((key, pattern))
+            waits.append(future)
+        for i in range(0, len(todo), self.batch_size):
+            # Held until done so a call outlives a caller that stopped waiting
+            task = self._loop.create_task(self._call(todo[i:i + self.batch_size]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        await asyncio.wait(waits)
+
+    async def _drain(self):
+        while self._tasks:
+            await asyncio.wait(list(self._tasks))
+
+    # Fingerprints for a list of (rule, record) alerts and the future of the backend calls
+    # started for the ones not cached yet (None when every alert was a cache hit)
+    def _request(self, alerts):
+        keys = []
+        missing = {}
+        for rule, record in alerts:
+            pattern = alert_pattern(rule, record)
+            key = fingerprint(pattern)
+            keys.append(key)
+            if key not in missing and self._get(key) is None:
+                missing[key] = pattern
+        hits = len(alerts) - sum(1 for key in keys if key in missing)
+        self.hits += hits
+        self.misses += len(alerts) - hits
+        metrics.inc('explain_cache_lookups_total', hits, outcome='hit')
+        metrics.inc('explain_cache_lookups_total', len(alerts) - hits, outcome='miss')
+        if not missing:
+            return keys, None
+        return keys, asyncio.run_coroutine_threadsafe(self._resolve(missing), self._loop)
+
+    # Fingerprints for a list of (rule, record) alerts, without waiting for the backend
+    def submit(self, alerts):
+        keys, _ = self._request(alerts)
+        return keys
+
+    # Cached explanation for a fingerprint from submit(), None until it has arrived
+    def lookup(self, key):
+        return self._get(key)
+
+    # Explanations for a list of (rule, record) alerts, None where the rule text should stand
+    def explain(self, alerts):
+        keys, future = self._request(alerts)
+        if future is not None:
+            try:
+                future.result(self.timeout)
+            except Exception:
+                # The calls keep running and fill the cache for later alerts
+                future.cancel()
+        texts = [self._get(key) for key in keys]
+        fallbacks = texts.count(None)
+        self.fallbacks += fallbacks
+        metrics.inc('explain_fallbacks_total', fallbacks)
+        return texts
+
+    def stats(self):
+        with self._lock:
+            entries = len(self._cache)
+        return {
+            'backend': self.backend.name,
+            'entries': entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'calls': self.calls,
+            'failures': self.failures,
+            'fallbacks': self.fallbacks,
+        }
+
+    # Wait for the backend calls in flight to finish and fill the cache
+    def drain(self, timeout=None):
+        asyncio.run_coroutine_threadsafe(self._drain(), self._loop).result(timeout)
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+_explainer = None
+_explainer_lock = threading.Lock()
+
+# Process-wide explainer for EXPLAIN_BACKEND, or None when explanations are disabled
+def get_explainer():
+    global _explainer
+    if not EXPLAIN_BACKEND:
+        return None
+    if _explainer is None:
+        with _explainer_lock:
+            if _explainer is None:
+                _explainer = Explainer(BACKENDS[EXPLAIN_BACKEND]())
+    return _explainer
+
+# Offline load test: synthetic transactions through a FraudMonitor with explanations
+def main(argv=None):
+    from fraud_monitor import FraudMonitor
+    from synthetic_data import generate_transactions
+
+    parser = argparse.ArgumentParser(description="Load-test fraud alert explanations")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="stub")
+    parser.add_argument("--transactions", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=500, help="transactions per monitor scan")
+    parser.add_argument("--fraud-rate", type=float, default=0.05)
+    parser.add_argument("--latency", type=float, default=EXPLAIN_STUB_LATENCY, help="stub response time in seconds")
+    parser.add_argument("--concurrency", type=int, default=EXPLAIN_CONCURRENCY)
+    parser.add_argument("--batch-size", type=int, default=EXPLAIN_BATCH, help="patterns per backend call")
+    parser.add_argument("--timeout", type=float, default=EXPLAIN_TIMEOUT)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    backend = StubBackend(args.latency) if args.backend == 'stub' else GeminiBackend()
+    explainer = Explainer(backend, concurrency=args.concurrency, batch_size=args.batch_size, timeout=args.timeout)
+    monitor = FraudMonitor(explainer=explainer)
+    transactions = generate_transactions(args.transactions, seed=args.seed, fraud_rate=args.fraud_rate)
+    transactions = transactions.drop(columns=['is_fraud'])
+
+    alerts = 0
+    waits = []
+    start = time.perf_counter()
+    for i in range(0, len(transactions), args.batch):
+        scan_start = time.perf_counter()
+        alerts += len(monitor.scan(transactions.iloc[i:i + args.batch]))
+        waits.append(time.perf_counter() - scan_start)
+    elapsed = time.perf_counter() - start
+    # Scans do not wait for the backend; let the calls still in flight finish before counting
+    drain_start = time.perf_counter()
+    explainer.drain()
+    drained = time.perf_counter() - drain_start
+    explained = sum(1 for alert in monitor.alerts.recent() if explainer.lookup(alert['explain_key']))
+    explainer.close()
+
+    waits.sort()
+    stats = explainer.stats()
+    stats.update({
+        'transactions': len(transactions),
+        'alerts': alerts,
+        'explained': explained,
+        'seconds': round(elapsed, 3),
+        'drain_seconds': round(drained, 3),
+        'scan_p50_ms': round(waits[len(waits) // 2] * 1000, 1),
+        'scan_max_ms': round(waits[-1] * 1000, 1),
+    })
+    json.dump(stats, sys.stdout, indent=2)
+    print()
+
+if __name__ == "__main__":
+    main()
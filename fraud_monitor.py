@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+
+import metrics
+from alert_index import AlertIndex
+from anomaly_model import ANOMALY_COMBINE, COMBINE_MODES, MODEL_BIT, MODEL_RULE, MODEL_SEVERITY, format_anomaly
+from gazetteer import get_gazetteer
+from rule_engine import RULES_PATH, get_rules
+from transaction_store import txn_id
+
+# Transactions read from a store per page, so a large backlog is never loaded at once
+STORE_PAGE = 50_000
+
+# Incremental fraud monitor: only transactions added since the last run are evaluated,
+# as one batch through the compiled rule set, and alerts are recorded in a bounded AlertIndex
+# that deduplicates them on (txn id, rule).
+# Locations are resolved to canonical cities (the city column) before the rules run.
+# With a VelocityTracker, per-UPI window features are added to each batch for the rules to use,
+# and with a TravelTracker, impossible travel between a UPI ID's consecutive transactions.
+# With a RingTracker, payer -> payee edges feed a graph that flags fast-growing fraud rings.
+# With an Explainer, each new alert is queued for an LLM explanation and keeps its fingerprint
+# (explain_key); the alert panel shows the explanation on a later rerun once it has arrived.
+# With an AnomalyModel, every row also gets an anomaly_score; combine="or" raises a model alert
+# (mask bit MODEL_BIT) for anomalous rows, "and" keeps rule hits only on anomalous rows.
+class FraudMonitor:
+    def __init__(self, rules_path=RULES_PATH, velocity=None, travel=None, rings=None, explainer=None, model=None, combine=ANOMALY_COMBINE):
+        if combine not in COMBINE_MODES:
+            raise ValueError(f"combine must be one of {COMBINE_MODES}, got {combine!r}")
+        self.rules_path = rules_path
+        self.velocity = velocity
+        self.travel = travel
+        self.rings = rings
+        self.explainer = explainer
+        self.model = model
+        self.combine = combine
+        self.cursor = 0
+        self.alerts = AlertIndex()
+
+    def evaluate(self, batch):
+        return get_rules(self.rules_path).evaluate(batch)
+
+    def _alert(self, txn_id, rule, severity, message):
+        alert = self.alerts.add(txn_id, rule, severity, message)
+        if alert is not None:
+            metrics.inc('fraud_alerts_raised_total', rule=rule)
+        return alert
+
+    # Evaluate a batch without deduplication: the rule-hit bitmask per row, and for
+    # flagged rows a list of (rule, severity, message, record) hits
+    def score(self, batch):
+        metrics.inc('fraud_transactions_scanned_total', len(batch))
+        if 'location' in batch:
+            batch = get_gazetteer().annotate(batch)
+        if self.velocity is not None:
+            batch = self.velocity.observe(batch)
+        if self.travel is not None:
+            batch = self.travel.observe(batch)
+        if self.rings is not None:
+            batch = self.rings.observe(batch)
+        rules = get_rules(self.rules_path)
+        masks = rules.evaluate(batch)
+        if self.model is not None and self.combine != 'off':
+            with metrics.timed('anomaly_model_score_seconds'):
+                scores = self.model.score(batch)
+            batch = batch.assign(anomaly_score=scores.round(2))
+            anomalous = scores >= self.model.threshold
+            metrics.inc('anomaly_model_flagged_total', int(anomalous.sum()))
+            if self.combine == 'and':
+                masks[~anomalous] = 0
+            else:
+                masks |= anomalous.astype(np.uint64) << np.uint64(MODEL_BIT)
+        hits = {}
+        rows = np.flatnonzero(masks)
+        # Only rows with a rule hit are materialized as dicts for the alert text
+        for row, record in zip(rows, batch.iloc[rows].to_dict('records')):
+            if 'id' not in record:
+                # Columnar batches carry integer seqs; ids are only formatted for flagged rows
+                record['id'] = txn_id(record['seq'])
+            hits[row] = [
+                (rules.names[bit], rules.severities[bit], rules.format_message(bit, record), record)
+                for bit in rules.hit_rules(masks[row])
+            ]
+            if int(masks[row]) >> MODEL_BIT & 1:
+                hits[row].append((MODEL_RULE, MODEL_SEVERITY, format_anomaly(record), record))
+        return masks, hits
+
+    # Index the new alerts in a batch and return their messages
+    def scan(self, batch):
+        if batch.empty:
+            return []
+        _, hits = self.score(batch)
+        new = []
+        for row in sorted(hits):
+            for rule, severity, message, record in hits[row]:
+                alert = self._alert(record['id'], rule, severity, message)
+                if alert is not None:
+                    new.append((alert, record))
+        if new and self.explainer is not None:
+            # Never waits for the backend: the scan stays as fast as without explanations
+            keys = self.explainer.submit([(alert['rule'], record) for alert, record in new])
+            for (alert, _), key in zip(new, keys):
+                alert['explain_key'] = key
+        return [alert['message'] for alert, _ in new]
+
+    # Evaluate the tail of an in-memory list of transaction dicts
+    def run(self, transactions):
+        if len(transactions) < self.cursor:
+            # The transaction list was reset, start over
+            self.cursor = 0
+        new = transactions[self.cursor:]
+        self.cursor = len(transactions)
+        if not new:
+            return []
+        return self.scan(pd.DataFrame.from_records(new))
+
+    # Evaluate transactions added to a TransactionStore since the last run
+    def run_store(self, store, page=STORE_PAGE):
+        messages = []
+        while True:
+            batch = store.since(self.cursor, page)
+            if batch.empty:
+                return messages
+            self.cursor = int(batch['seq'].iat[-1])
+            messages.extend(self.scan(batch))
+            if len(batch) < page:
+                return messages
@@ -0,0 +1,141 @@
+import time
+from array import array
+
+import numpy as np
+import pandas as pd
+
+# Accounts with more payments than this (merchants, payroll, very active users) are hubs:
+# their edges are counted but not merged, so a hub cannot chain its customers into one cluster
+HUB_DEGREE = 16
+
+# A cluster that gains this many accounts within RING_WINDOW seconds is flagged as a ring.
+# Kept above HUB_DEGREE, so a single account paying (or paid by) new people is never enough.
+RING_GROWTH = 20
+RING_WINDOW = 600.0
+
+# ... and when at least this share of the cluster joined within the window; clusters that
+# grew steadily over a longer time are the ordinary payment network, not a ring
+RING_FRESH_SHARE = 0.5
+
+# Clusters larger than this are treated as the established payment network, not a ring
+RING_MAX_SIZE = 500
+
+# Payments seen before any cluster is flagged. Until then merchants have not yet reached
+# HUB_DEGREE and still link their customers, so every early cluster looks new.
+RING_WARMUP = 10_000
+
+RING_COLUMNS = ['payee_fan_in', 'ring_size', 'ring_growth', 'fraud_ring']
+
+# Fraud-ring detection over the payer -> payee graph. UPI IDs are interned to integer nodes;
+# connected components are kept in a union-find (union by size, path halving) over compact int
+# arrays, so each edge costs a couple of near-constant-time finds. Per node the tracker keeps
+# its degree and fan-in (payments received); per cluster root, how many accounts joined since
+# the cluster's growth window opened. Nodes are never evicted: about 40 bytes of arrays plus
+# one dict entry per UPI ID.
+class RingTracker:
+    def __init__(self, hub_degree=HUB_DEGREE, ring_growth=RING_GROWTH, ring_window=RING_WINDOW, fresh_share=RING_FRESH_SHARE, ring_max_size=RING_MAX_SIZE, warmup=RING_WARMUP):
+        self.hub_degree = hub_degree
+        self.ring_growth = ring_growth
+        self.ring_window = ring_window
+        self.fresh_share = fresh_share
+        self.ring_max_size = ring_max_size
+        self.warmup = warmup
+        self.edges = 0
+        self.nodes = {}
+        self.parent = array('i')
+        self.size = array('i')
+        self.growth = array('i')
+        self.window_start = array('d')
+        self.degree = np.zeros(1024, dtype=np.int32)
+        self.fan_in = np.zeros(1024, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    # Node ids for UPI IDs, one dictionary probe per distinct value
+    def _intern(self, upis):
+        codes, uniques = pd.factorize(upis)
+        ids = np.empty(len(uniques), dtype=np.int64)
+        for i, upi in enumerate(uniques):
+            node = self.nodes.get(upi)
+            if node is None:
+                node = self.nodes[upi] = len(self.parent)
+                self.parent.append(node)
+                self.size.append(1)
+                self.growth.append(0)
+                self.window_start.append(-np.inf)
+            ids[i] = node
+        if len(self.parent) > len(self.degree):
+            capacity = max(len(self.parent), 2 * len(self.degree))
+            self.degree = np.concatenate([self.degree, np.zeros(capacity - len(self.degree), dtype=np.int32)])
+            self.fan_in = np.concatenate([self.fan_in, np.zeros(capacity - len(self.fan_in), dtype=np.int32)])
+        return ids[codes]
+
+    def find(self, node):
+        parent = self.parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    # Merge the clusters of a and b at time ts and return the surviving root
+    def union(self, a, b, ts):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return a
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        if ts - self.window_start[a] > self.ring_window:
+            self.window_start[a] = ts
+            self.growth[a] = 0
+        # Every account of the smaller cluster is new to the larger one
+        self.growth[a] += self.size[b]
+        self.size[a] += self.size[b]
+        self.parent[b] = a
+        return a
+
+    # Return the batch with ring columns added; rows without a payee get 0/False
+    def observe(self, batch, now=None):
+        now = time.time() if now is None else now
+        n = len(batch)
+        columns = {
+            'payee_fan_in': np.zeros(n, dtype=np.int64),
+            'ring_size': np.zeros(n, dtype=np.int64),
+            'ring_growth': np.zeros(n, dtype=np.int64),
+            'fraud_ring': np.zeros(n, dtype=bool),
+        }
+        if 'payee' in batch:
+            payer = batch['upi'].to_numpy(dtype=object)
+            payee = batch['payee'].to_numpy(dtype=object)
+            rows = np.flatnonzero(pd.notna(payer) & pd.notna(payee) & (payer != payee))
+            if len(rows):
+                self._link(batch, payer[rows], payee[rows], rows, now, columns)
+        return batch.assign(**columns)
+
+    def _link(self, batch, payer, payee, rows, now, columns):
+        timestamps = batch['created_at'].to_numpy(dtype=np.float64)[rows] if 'created_at' in batch else np.full(len(rows), now)
+        ids = self._intern(np.concatenate([payer, payee]))
+        src, dst = ids[:len(rows)], ids[len(rows):]
+        np.add.at(self.degree, src, 1)
+        np.add.at(self.degree, dst, 1)
+        np.add.at(self.fan_in, dst, 1)
+        # Hubs are judged on their degree after the whole batch
+        merge = (self.degree[src] <= self.hub_degree) & (self.degree[dst] <= self.hub_degree)
+
+        sizes = columns['ring_size'][rows]
+        growth = columns['ring_growth'][rows]
+        window, limit, max_size = self.ring_window, self.ring_growth, self.ring_max_size
+        order = np.argsort(timestamps, kind='stable')
+        seen = np.empty(len(rows), dtype=np.int64)
+        seen[order] = self.edges + np.arange(len(rows))
+        self.edges += len(rows)
+        for i in order:
+            ts = timestamps[i]
+            root = self.union(int(src[i]), int(dst[i]), ts) if merge[i] else self.find(int(dst[i]))
+            grown = self.growth[root] if ts - self.window_start[root] <= window else 0
+            sizes[i], growth[i] = self.size[root], grown
+        columns['payee_fan_in'][rows] = self.fan_in[dst]
+        columns['ring_size'][rows] = sizes
+        columns['ring_growth'][rows] = growth
+        fast = (growth >= limit) & (growth >= self.fresh_share * sizes)
+        columns['fraud_ring'][rows] = fast & (sizes <= max_size) & (seen >= self.warmup)
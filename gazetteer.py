@@ -0,0 +1,131 @@
+import os
+import re
+import difflib
+import threading
+from collections import Counter, defaultdict
+
+import numpy as np
+import pandas as pd
+
+# Bundled city list with coordinates and alternate names, overridable for other regions
+GAZETTEER_PATH = os.environ.get(
+    "GAZETTEER_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "gazetteer.csv"),
+)
+
+# Minimum difflib similarity for a fuzzy match ("dehli" -> "delhi" scores 0.8)
+MIN_SIMILARITY = 0.8
+
+# Fuzzy candidates shortlisted by shared trigrams before scoring
+CANDIDATES = 5
+
+# Most distinct location strings remembered; the memo is cleared when it fills up
+MEMO_SIZE = 100_000
+
+_NON_LETTERS = re.compile(r"[^a-z]+")
+
+def clean_location(text):
+    return _NON_LETTERS.sub(' ', str(text).lower()).strip()
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+# City gazetteer resolving free-text locations to a canonical city: an exact alias lookup,
+# then a trigram index shortlisting fuzzy candidates. Every distinct input string is
+# resolved once and memoized, so a batch costs one factorize plus a few dict lookups.
+class Gazetteer:
+    def __init__(self, path=GAZETTEER_PATH, min_similarity=MIN_SIMILARITY):
+        cities = pd.read_csv(path, keep_default_na=False)
+        self.min_similarity = min_similarity
+        self.names = cities['city'].tolist()
+        self.states = cities['state'].tolist()
+        self.lat = cities['lat'].to_numpy(dtype=np.float64)
+        self.lon = cities['lon'].to_numpy(dtype=np.float64)
+        self._exact = {}
+        for i, (name, aliases) in enumerate(zip(cities['city'], cities['aliases'])):
+            for alias in [name] + aliases.split('|'):
+                if alias:
+                    self._exact[clean_location(alias)] = i
+        self._aliases = list(self._exact)
+        self._postings = defaultdict(list)
+        for alias_id, alias in enumerate(self._aliases):
+            for gram in trigrams(alias):
+                self._postings[gram].append(alias_id)
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.names)
+
+    def _fuzzy(self, text):
+        shared = Counter()
+        for gram in trigrams(text):
+            shared.update(self._postings.get(gram, ()))
+        best, best_score = -1, self.min_similarity
+        for alias_id, _ in shared.most_common(CANDIDATES):
+            alias = self._aliases[alias_id]
+            score = difflib.SequenceMatcher(None, text, alias).ratio()
+            if score >= best_score:
+                best, best_score = self._exact[alias], score
+        return best
+
+    # City index for one location string, or -1 if it matches nothing.
+    # "Koramangala, Bengaluru" style inputs are tried part by part.
+    def lookup(self, location):
+        city = self._memo.get(location)
+        if city is not None:
+            return city
+        parts = [clean_location(part) for part in str(location).split(',')]
+        parts = [part for part in parts if part]
+        city = next((self._exact[part] for part in parts if part in self._exact), -1)
+        if city < 0:
+            city = next((match for match in map(self._fuzzy, parts) if match >= 0), -1)
+        with self._lock:
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            self._memo[location] = city
+        return city
+
+    def _factorize(self, locations):
+        if isinstance(getattr(locations, 'dtype', None), pd.CategoricalDtype):
+            # Already interned: resolve the categories and reuse the codes
+            codes, uniques = np.asarray(locations.array.codes), locations.cat.categories
+        else:
+            codes, uniques = pd.factorize(pd.Series(locations, dtype=object))
+        ids = np.array([self.lookup(location) for location in uniques], dtype=np.int32)
+        return codes, uniques, ids
+
+    # City indexes for a column of locations; missing values resolve to -1
+    def resolve(self, locations):
+        codes, _, ids = self._factorize(locations)
+        return np.append(ids, -1)[codes]
+
+    def canonical(self, location):
+        city = self.lookup(location)
+        return self.names[city] if city >= 0 else None
+
+    # Add city, city_lat and city_lon columns for the batch's location column.
+    # Unmatched locations keep their cleaned text as the city and get NaN coordinates.
+    def annotate(self, batch):
+        codes, uniques, ids = self._factorize(batch['location'])
+        # Per distinct location, plus a trailing missing-value entry picked by code -1
+        city = [self.names[i] if i >= 0 else clean_location(location) for i, location in zip(ids, uniques)]
+        city = np.array(city + [None], dtype=object)
+        ids = np.append(ids, -1)
+        known = ids >= 0
+        lat = np.where(known, self.lat[ids], np.nan)
+        lon = np.where(known, self.lon[ids], np.nan)
+        return batch.assign(city=city[codes], city_lat=lat[codes], city_lon=lon[codes])
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+# Process-wide gazetteer, loaded on first use
+def get_gazetteer():
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                _gazetteer = Gazetteer()
+    return _gazetteer
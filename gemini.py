@@ -0,0 +1,19 @@
+import os
+import threading
+
+# Gemini API key, read from the environment rather than the source
+GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "")
+
+_genai = None
+_genai_lock = threading.Lock()
+
+# google.generativeai, imported and configured on first use only
+def get_genai():
+    global _genai
+    if _genai is None:
+        with _genai_lock:
+            if _genai is None:
+                import google.generativeai as genai
+                genai.configure(api_key=GEMINI_API_KEY)
+                _genai = genai
+    return _genai
@@ -0,0 +1,47 @@
+import time
+
+import numpy as np
+from PIL import Image, ImageOps
+
+# Longest side (pixels) an image is reduced to before OCR
+MAX_OCR_SIDE = 1280
+
+# Band of an Aadhar card front where the 12-digit number is printed (left, top, right, bottom fractions)
+AADHAR_NUMBER_BOX = (0.0, 0.55, 1.0, 0.95)
+
+def crop_fraction(image, box):
+    width, height = image.size
+    left, top, right, bottom = box
+    return image.crop((int(left * width), int(top * height), int(right * width), int(bottom * height)))
+
+# Normalize orientation, downscale, grayscale and optionally crop an image for OCR.
+# Returns the reduced image as a numpy array plus the time spent in each stage (seconds).
+def preprocess_for_ocr(image, max_side=MAX_OCR_SIDE, crop_box=None):
+    timings = {}
+
+    start = time.perf_counter()
+    if max(image.size) > max_side:
+        # draft() lets the JPEG decoder skip most of the full-resolution work
+        image.draft("L", (max_side, max_side))
+    image.load()
+    timings['decode'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    image = ImageOps.exif_transpose(image)
+    timings['orient'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if max(image.size) > max_side:
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+    timings['downscale'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    image = image.convert("L")
+    timings['grayscale'] = time.perf_counter() - start
+
+    if crop_box is not None:
+        start = time.perf_counter()
+        image = crop_fraction(image, crop_box)
+        timings['crop'] = time.perf_counter() - start
+
+    return np.asarray(image), timings
@@ -0,0 +1,223 @@
+import sys
+import sqlite3
+import json
+import time
+import asyncio
+import argparse
+
+import numpy as np
+
+from upi import validate_upi_bulk
+from fraud_monitor import FraudMonitor
+from velocity import VelocityTracker
+from travel import TravelTracker
+from fraud_ring import RingTracker
+from anomaly_model import get_anomaly_model
+from transaction_store import TransactionStore, TRANSACTIONS_DB, parse_amount, parse_timestamp
+
+# Records per micro-batch handed to the fraud monitor
+BATCH_SIZE = 1000
+
+# Longest a partial batch waits before it is scored anyway (seconds)
+BATCH_TIMEOUT = 0.05
+
+# Maximum records buffered between reader and scorer; readers block beyond this (backpressure)
+QUEUE_SIZE = 20000
+
+# Ingest statistics: sustained rate and end-to-end latency (arrival to alerting)
+class IngestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.received = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.alerts = 0
+        self.batches = 0
+        self.latencies = []
+
+    def record_batch(self, arrivals, accepted, alerts):
+        done = time.perf_counter()
+        self.batches += 1
+        self.accepted += accepted
+        self.rejected += len(arrivals) - accepted
+        self.alerts += alerts
+        self.latencies.extend(done - arrivals)
+        # Keep a bounded latency sample for percentiles
+        if len(self.latencies) > 100000:
+            self.latencies = self.latencies[-50000:]
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        latencies = np.asarray(self.latencies) * 1000
+        p50, p99 = np.percentile(latencies, [50, 99]) if len(latencies) else (0.0, 0.0)
+        return {
+            'received': self.received,
+            'accepted': self.accepted,
+            'rejected': self.rejected,
+            'alerts': self.alerts,
+            'batches': self.batches,
+            'rate_per_sec': self.received / elapsed if elapsed else 0.0,
+            'latency_p50_ms': float(p50),
+            'latency_p99_ms': float(p99),
+        }
+
+# A transaction dict with amount and created_at normalised to floats (created_at in epoch
+# seconds, ISO 8601 strings accepted), or None for a line that must be rejected
+def parse_record(line):
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(record, dict) or 'upi' not in record:
+        return None
+    try:
+        for field, parse in (('amount', parse_amount), ('created_at', parse_timestamp)):
+            if record.get(field) is not None:
+                record[field] = parse(record[field])
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return record
+
+# Count a received line and queue its record; malformed lines are rejected here
+async def enqueue(line, queue, stats):
+    if not line.strip():
+        return
+    stats.received += 1
+    record = parse_record(line)
+    if record is None:
+        stats.rejected += 1
+        return
+    # put() blocks when the scorer falls behind
+    await queue.put((time.perf_counter(), record))
+
+async def tail_jsonl(path, queue, stats, follow=True, poll_interval=0.1):
+    with open(path, encoding="utf-8") as f:
+        while True:
+            line = f.readline()
+            if not line:
+                if not follow:
+                    return
+                await asyncio.sleep(poll_interval)
+                continue
+            await enqueue(line, queue, stats)
+
+async def serve_socket(host, port, queue, stats):
+    async def handle(reader, writer):
+        while line := await reader.readline():
+            await enqueue(line, queue, stats)
+        writer.close()
+    server = await asyncio.start_server(handle, host, port)
+    async with server:
+        await server.serve_forever()
+
+async def next_batch(queue, batch_size=BATCH_SIZE, timeout=BATCH_TIMEOUT):
+    batch = [await queue.get()]
+    deadline = time.perf_counter() + timeout
+    while len(batch) < batch_size:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(queue.get(), remaining))
+        except asyncio.TimeoutError:
+            break
+    return batch
+
+# Store a micro-batch, falling back to one record at a time so a malformed record is
+# rejected on its own instead of stopping the stream; returns how many were stored
+def store_records(store, records):
+    try:
+        store.add_many(records)
+        return len(records)
+    except (sqlite3.Error, ValueError, TypeError):
+        stored = 0
+        for record in records:
+            try:
+                store.add_many([record])
+                stored += 1
+            except (sqlite3.Error, ValueError, TypeError):
+                pass
+        return stored
+
+# Validate UPI IDs, store accepted records and score each micro-batch
+async def score_batches(queue, store, monitor, stats, on_alerts=None):
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = await next_batch(queue)
+        arrivals = np.array([arrived for arrived, _ in batch])
+        records = [record for _, record in batch]
+        valid = validate_upi_bulk([record['upi'] for record in records])
+        accepted = [record for record, ok in zip(records, valid) if ok]
+
+        def score():
+            stored = store_records(store, accepted) if accepted else 0
+            return stored, monitor.run_store(store)
+        # Storage and scoring run off the event loop so readers keep draining sockets
+        stored, alerts = await loop.run_in_executor(None, score)
+        stats.record_batch(arrivals, stored, len(alerts))
+        if on_alerts and alerts:
+            on_alerts(alerts)
+        for _ in batch:
+            queue.task_done()
+
+async def report_periodically(stats, interval):
+    while True:
+        await asyncio.sleep(interval)
+        print(json.dumps(stats.report()), file=sys.stderr)
+
+async def run(args):
+    queue = asyncio.Queue(maxsize=args.queue_size)
+    stats = IngestStats()
+    store = TransactionStore(args.db)
+    if args.shards:
+        from sharded_scoring import ShardedFraudMonitor
+        monitor = ShardedFraudMonitor(args.shards)
+    else:
+        monitor = FraudMonitor(velocity=VelocityTracker(), travel=TravelTracker(), rings=RingTracker(), model=get_anomaly_model())
+    # Only score what arrives from the feed, not the existing history
+    monitor.cursor = store.last_seq()
+
+    if args.socket:
+        host, _, port = args.socket.rpartition(':')
+        source = asyncio.create_task(serve_socket(host or '127.0.0.1', int(port), queue, stats))
+    else:
+        source = asyncio.create_task(tail_jsonl(args.jsonl, queue, stats, follow=args.follow))
+    scorer = asyncio.create_task(score_batches(
+        queue, store, monitor, stats, on_alerts=(lambda alerts: print("\n".join(alerts))) if args.print_alerts else None,
+    ))
+    reporter = asyncio.create_task(report_periodically(stats, args.report_interval))
+    async def drained():
+        await source
+        await queue.join()
+    finished = asyncio.create_task(drained())
+    try:
+        await asyncio.wait([finished, scorer], return_when=asyncio.FIRST_COMPLETED)
+        if scorer.done():
+            # Surface scoring failures instead of waiting on a queue nobody drains
+            scorer.result()
+    finally:
+        finished.cancel()
+        scorer.cancel()
+        reporter.cancel()
+        if args.shards:
+            monitor.close()
+    print(json.dumps(stats.report()), file=sys.stderr)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream transactions into the store and fraud monitor")
+    feed = parser.add_mutually_exclusive_group(required=True)
+    feed.add_argument("--jsonl", help="JSONL file of transactions to tail")
+    feed.add_argument("--socket", help="listen for JSONL transactions on HOST:PORT")
+    parser.add_argument("--follow", action="store_true", help="keep tailing the file for new lines")
+    parser.add_argument("--db", default=TRANSACTIONS_DB)
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE)
+    parser.add_argument("--report-interval", type=float, default=5.0)
+    parser.add_argument("--print-alerts", action="store_true")
+    parser.add_argument("--shards", type=int, default=0, help="score in this many worker processes sharded by UPI ID")
+    try:
+        asyncio.run(run(parser.parse_args(argv)))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import os
+
+import streamlit as st
+
+from jobs import get_job_queue
+
+# Seconds between progress polls of a running background job
+JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", "0.5"))
+
+# Only this fragment reruns while a job is in flight, so the rest of the page stays interactive
+@st.fragment(run_every=JOB_POLL_INTERVAL)
+def _poll(job_id):
+    job = get_job_queue().get(job_id)
+    if job is None or job.done:
+        # Finished (or expired): rerun the page so the caller renders the result
+        st.rerun()
+    st.progress(job.progress, text=f"⏳ {job.stage.capitalize()}…")
+
+# Show progress for a job until it finishes; returns True once its result can be rendered
+def render_job_progress(job):
+    if job.done:
+        return True
+    _poll(job.id)
+    return False
@@ -0,0 +1,125 @@
+import os
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+
+# Threads running background jobs (OCR and other slow verifications)
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+
+# Most jobs queued or running at once; submissions beyond this are rejected
+JOB_QUEUE_SIZE = int(os.environ.get("JOB_QUEUE_SIZE", "16"))
+
+# Finished jobs stay attachable this long (seconds), and at most JOB_HISTORY of them
+JOB_RETENTION = float(os.environ.get("JOB_RETENTION", "600"))
+JOB_HISTORY = 1000
+
+class QueueFull(RuntimeError):
+    pass
+
+class Job:
+    def __init__(self, kind, key):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.key = key
+        self.state = 'queued'
+        self.stage = 'queued'
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.finished = None
+
+    @property
+    def done(self):
+        return self.state in ('done', 'failed')
+
+    # Progress callback handed to the job function
+    def report(self, stage, progress):
+        self.stage = stage
+        self.progress = min(max(progress, 0.0), 1.0)
+
+# Bounded background job queue shared by all sessions. Jobs are keyed by (kind, key), so a
+# rerun that submits the same work (e.g. the same uploaded image) attaches to the job already
+# queued, running or recently finished instead of starting another. That includes failed jobs,
+# so a rerun shows the error instead of failing again; only submit(..., retry=True) replaces one.
+class JobQueue:
+    def __init__(self, workers=JOB_WORKERS, max_pending=JOB_QUEUE_SIZE, retention=JOB_RETENTION):
+        self.max_pending = max_pending
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="job")
+        self._jobs = OrderedDict()
+        self._by_key = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _expire(self, now):
+        for job_id, job in list(self._jobs.items()):
+            if job.done and (now - job.finished > self.retention or len(self._jobs) > JOB_HISTORY):
+                self._forget(job)
+
+    def _forget(self, job):
+        del self._jobs[job.id]
+        if self._by_key.get((job.kind, job.key)) == job.id:
+            del self._by_key[(job.kind, job.key)]
+
+    # Queue fn(*args, progress=job.report) unless the same (kind, key) job is already known;
+    # with retry=True a failed job for the key is replaced by a new one
+    def submit(self, kind, key, fn, *args, retry=False):
+        with self._lock:
+            self._expire(time.time())
+            job_id = self._by_key.get((kind, key))
+            if job_id is not None and not (retry and self._jobs[job_id].state == 'failed'):
+                metrics.inc('jobs_submitted_total', kind=kind, outcome='attached')
+                return self._jobs[job_id]
+            if self._pending >= self.max_pending:
+                metrics.inc('jobs_submitted_total', kind=kind, outcome='rejected')
+                raise QueueFull(f"{self._pending} jobs already queued or running")
+            if job_id is not None:
+                self._forget(self._jobs[job_id])
+            job = Job(kind, key)
+            self._jobs[job.id] = job
+            self._by_key[(kind, key)] = job.id
+            self._pending += 1
+        metrics.inc('jobs_submitted_total', kind=kind, outcome='queued')
+        self._executor.submit(self._run, job, fn, args)
+        return job
+
+    def _run(self, job, fn, args):
+        start = time.perf_counter()
+        job.state = job.stage = 'running'
+        try:
+            job.result = fn(*args, progress=job.report)
+            job.progress = 1.0
+            job.state = job.stage = 'done'
+        except Exception as e:
+            job.error = str(e) or type(e).__name__
+            job.state = job.stage = 'failed'
+        finally:
+            job.finished = time.time()
+            with self._lock:
+                self._pending -= 1
+            metrics.observe('job_seconds', time.perf_counter() - start, kind=job.kind)
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            return {'pending': self._pending, 'jobs': len(self._jobs), 'max_pending': self.max_pending}
+
+_queue = None
+_queue_lock = threading.Lock()
+
+# Process-wide job queue shared by all sessions
+def get_job_queue():
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue()
+    return _queue
@@ -0,0 +1,59 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Precompiled KYC field patterns
+PAN = r'[A-Z]{5}[0-9]{4}[A-Z]'
+GSTIN = r'[0-9]{2}[A-Z]{5}[0-9]{4}[A-Z][1-9A-Z]Z[0-9A-Z]'
+BANK_ACCOUNT = r'[0-9]{9,18}'
+PAN_PATTERN = re.compile(PAN)
+GSTIN_PATTERN = re.compile(GSTIN)
+BANK_ACCOUNT_PATTERN = re.compile(BANK_ACCOUNT)
+
+# GSTIN check digit alphabet (base 36)
+GSTIN_CHARS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_GSTIN_VALUES = np.zeros(256, dtype=np.int64)
+_GSTIN_VALUES[np.frombuffer(GSTIN_CHARS.encode("ascii"), dtype=np.uint8)] = np.arange(36)
+_GSTIN_FACTORS = np.tile([1, 2], 7)
+
+def gstin_check_char(gstin):
+    total = 0
+    for i, char in enumerate(gstin[:14]):
+        product = GSTIN_CHARS.index(char) * (1 if i % 2 == 0 else 2)
+        total += product // 36 + product % 36
+    return GSTIN_CHARS[(36 - total % 36) % 36]
+
+def is_valid_pan(pan_number):
+    return PAN_PATTERN.fullmatch(pan_number) is not None
+
+def is_valid_gstin(gst_number):
+    return GSTIN_PATTERN.fullmatch(gst_number) is not None and gst_number[14] == gstin_check_char(gst_number)
+
+def is_valid_bank_account(account_number):
+    return BANK_ACCOUNT_PATTERN.fullmatch(account_number) is not None
+
+def _strings(values):
+    return pd.Series(values, copy=False).fillna('').astype(str)
+
+def _fullmatch(values, pattern):
+    return _strings(values).str.fullmatch(pattern).fillna(False).to_numpy(dtype=bool)
+
+def validate_pan_bulk(values):
+    return _fullmatch(values, PAN)
+
+def validate_bank_account_bulk(values):
+    return _fullmatch(values, BANK_ACCOUNT)
+
+# Validate GSTIN format and check digit for a whole column at once
+def validate_gstin_bulk(values):
+    strings = _strings(values)
+    valid = strings.str.fullmatch(GSTIN).fillna(False).to_numpy(dtype=bool, copy=True)
+    if not valid.any():
+        return valid
+    # Well-formed GSTINs are 15 ASCII chars, so they pack into a (n, 15) byte matrix
+    codes = np.frombuffer("".join(strings[valid]).encode("ascii"), dtype=np.uint8).reshape(-1, 15)
+    products = _GSTIN_VALUES[codes[:, :14]] * _GSTIN_FACTORS
+    totals = (products // 36 + products % 36).sum(axis=1)
+    valid[valid] = (36 - totals % 36) % 36 == _GSTIN_VALUES[codes[:, 14]]
+    return valid
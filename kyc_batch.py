@@ -0,0 +1,110 @@
+import os
+import sys
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from kyc import validate_pan_bulk, validate_gstin_bulk, validate_bank_account_bulk
+from upi import validate_upi_bulk
+
+# Verdict column written for each KYC field that is present in the input
+VALIDATORS = {
+    'pan': validate_pan_bulk,
+    'gstin': validate_gstin_bulk,
+    'account': validate_bank_account_bulk,
+    'upi': validate_upi_bulk,
+}
+
+def read_chunks(path, columns, chunksize):
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        offset = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            chunk = batch.to_pandas()
+            # Row numbers continue across batches, as read_csv's do
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            yield chunk
+    else:
+        yield from pd.read_csv(path, usecols=columns, dtype=str, keep_default_na=False, chunksize=chunksize)
+
+# Validate one chunk; runs in a worker process
+def verify_chunk(chunk, fields, id_col):
+    verdicts = pd.DataFrame(index=chunk.index)
+    if id_col:
+        verdicts[id_col] = chunk[id_col].to_numpy()
+    valid = np.ones(len(chunk), dtype=bool)
+    for field, column in fields.items():
+        verdicts[f'{field}_valid'] = VALIDATORS[field](chunk[column].to_numpy())
+        valid &= verdicts[f'{field}_valid'].to_numpy()
+    verdicts['kyc_valid'] = valid
+    return verdicts
+
+class VerdictWriter:
+    def __init__(self, path):
+        self.path = path
+        self._parquet = None
+        self._first = True
+
+    def write(self, verdicts):
+        if self.path.endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(verdicts, preserve_index=True)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            verdicts.to_csv(self.path, mode="w" if self._first else "a", header=self._first, index_label="row")
+        self._first = False
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+def run(args):
+    fields = {field: getattr(args, f'{field}_col') for field in VALIDATORS if getattr(args, f'{field}_col')}
+    if not fields:
+        raise SystemExit("No KYC columns selected")
+    columns = list(fields.values()) + ([args.id_col] if args.id_col else [])
+    writer = VerdictWriter(args.output)
+    rows = 0
+    invalid = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        # Keep a bounded number of chunks in flight so memory stays flat on huge inputs
+        pending = deque()
+        def drain(limit):
+            nonlocal rows, invalid
+            while len(pending) > limit:
+                verdicts = pending.popleft().result()
+                writer.write(verdicts)
+                rows += len(verdicts)
+                invalid += int((~verdicts['kyc_valid']).sum())
+        for chunk in read_chunks(args.input, columns, args.chunksize):
+            pending.append(pool.submit(verify_chunk, chunk, fields, args.id_col))
+            drain(args.workers * 2)
+        drain(0)
+    writer.close()
+    elapsed = time.perf_counter() - start
+    print(f"{rows} records, {invalid} invalid, {elapsed:.2f}s ({rows / max(elapsed, 1e-9) * 60:,.0f} records/min)", file=sys.stderr)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk KYC verification for PAN, GSTIN, bank account and UPI files")
+    parser.add_argument("input", help="CSV or Parquet file of KYC records")
+    parser.add_argument("output", help="CSV or Parquet file for per-row verdicts")
+    parser.add_argument("--pan-col", help="column holding PAN numbers")
+    parser.add_argument("--gstin-col", help="column holding GSTINs")
+    parser.add_argument("--account-col", help="column holding bank account numbers")
+    parser.add_argument("--upi-col", help="column holding UPI IDs")
+    parser.add_argument("--id-col", help="column copied to the output to identify each record")
+    parser.add_argument("--chunksize", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    run(parser.parse_args(argv))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import json
+import time
+import argparse
+import threading
+import http.client
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from synthetic_data import generate_transactions
+
+# Closed-loop load generator for scoring_service.py: each worker keeps one
+# keep-alive connection and sends its next request as soon as the last returns.
+def worker(url, payloads, latencies, errors):
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    for path, body in payloads:
+        start = time.perf_counter()
+        try:
+            conn.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+                continue
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(repr(e))
+            conn.close()
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the fraud-scoring service")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=1, help="transactions per request (1 uses /score)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the summary as JSON")
+    args = parser.parse_args(argv)
+
+    txns = generate_transactions(args.requests * args.batch_size, args.seed)
+    records = txns[['upi', 'amount', 'location']].to_dict('records')
+    if args.batch_size == 1:
+        payloads = [("/score", json.dumps(r)) for r in records]
+    else:
+        payloads = [
+            ("/score/batch", json.dumps(records[i:i + args.batch_size]))
+            for i in range(0, len(records), args.batch_size)
+        ]
+
+    latencies = []
+    errors = []
+    threads = [
+        threading.Thread(target=worker, args=(args.url, payloads[i::args.concurrency], latencies, errors))
+        for i in range(args.concurrency)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    ms = np.asarray(latencies) * 1000
+    summary = {
+        'requests': len(payloads),
+        'transactions': len(records),
+        'concurrency': args.concurrency,
+        'errors': len(errors),
+        'requests_per_sec': len(latencies) / elapsed,
+        'transactions_per_sec': len(latencies) * args.batch_size / elapsed,
+        'latency_p50_ms': float(np.percentile(ms, 50)) if len(ms) else None,
+        'latency_p99_ms': float(np.percentile(ms, 99)) if len(ms) else None,
+        'latency_max_ms': float(ms.max()) if len(ms) else None,
+    }
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import os
+import time
+import cProfile
+import threading
+from contextlib import contextmanager
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Prometheus text file rewritten after every dashboard rerun (empty disables it)
+METRICS_FILE = os.environ.get("METRICS_FILE", "metrics.prom")
+
+# Serve /metrics on this port when set
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0"))
+
+# Dump a cProfile of each completed rerun into this directory when set
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "")
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HELP = {
+    'dashboard_rerun_seconds': "Wall time of a full dashboard rerun",
+    'dashboard_stage_seconds': "Wall time of one stage of a dashboard rerun",
+    'ocr_model_load_seconds': "Time spent loading OCR models",
+    'ocr_inference_seconds': "Time spent in OCR inference per image",
+    'ocr_cache_lookups_total': "OCR result cache lookups by outcome",
+    'fraud_transactions_scanned_total': "Transactions evaluated by the fraud monitor",
+    'fraud_alerts_raised_total': "Fraud alerts raised",
+    'scoring_request_seconds': "Scoring service request latency",
+    'scoring_batches_total': "Micro-batches scored by the scoring service",
+    'scoring_transactions_total': "Transactions scored by the scoring service",
+    'explain_call_seconds': "Latency of one fraud explanation backend call",
+    'explain_calls_total': "Fraud explanation backend calls by outcome",
+    'explain_cache_lookups_total': "Fraud explanation cache lookups by outcome",
+    'explain_fallbacks_total': "Alerts shown with the rule text because no explanation was ready",
+    'jobs_submitted_total': "Background job submissions by outcome (queued, attached, rejected)",
+    'job_seconds': "Run time of one background job",
+    'anomaly_model_score_seconds': "Time spent scoring one batch with the anomaly model",
+    'anomaly_model_flagged_total': "Transactions scored as anomalous by the anomaly model",
+}
+
+_lock = threading.Lock()
+_counters = defaultdict(float)
+_histograms = {}
+_local = threading.local()
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+def inc(name, value=1, **labels):
+    with _lock:
+        _counters[_key(name, labels)] += value
+
+def observe(name, seconds, **labels):
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = [[0] * len(BUCKETS), 0, 0.0]
+        buckets, _, _ = histogram
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                buckets[i] += 1
+        histogram[1] += 1
+        histogram[2] += seconds
+
+@contextmanager
+def timed(name, **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+# Time one stage of the current dashboard rerun
+@contextmanager
+def stage(name):
+    with timed('dashboard_stage_seconds', script=getattr(_local, 'script', ''), stage=name):
+        yield
+
+def _labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        f'{k}="' + str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for k, v in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+# Render all metrics in the Prometheus text exposition format
+def render():
+    lines = []
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((key, (list(h[0]), h[1], h[2])) for key, h in _histograms.items())
+    described = set()
+    def describe(name, kind):
+        if name not in described:
+            described.add(name)
+            if name in HELP:
+                lines.append(f"# HELP {name} {HELP[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+    for (name, labels), value in counters:
+        describe(name, "counter")
+        lines.append(f"{name}{_labels(labels)} {value:g}")
+    for (name, labels), (buckets, count, total) in histograms:
+        describe(name, "histogram")
+        for bound, hits in zip(BUCKETS, buckets):
+            lines.append(f"{name}_bucket{_labels(labels, [('le', f'{bound:g}')])} {hits}")
+        lines.append(f"{name}_bucket{_labels(labels, [('le', '+Inf')])} {count}")
+        lines.append(f"{name}_count{_labels(labels)} {count}")
+        lines.append(f"{name}_sum{_labels(labels)} {total:.6f}")
+    return "\n".join(lines) + "\n"
+
+def write_textfile(path=METRICS_FILE):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(render())
+    os.replace(tmp_path, path)
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+_server = None
+
+def start_http_server(port=METRICS_PORT, host="127.0.0.1"):
+    global _server
+    with _lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+    return _server
+
+# Mark the start of a dashboard rerun; pair with end_rerun() at the bottom of the script.
+# Reruns cut short by st.rerun()/st.stop() keep their stage timings but are not profiled.
+def begin_rerun(script):
+    _local.script = script
+    _local.started = time.perf_counter()
+    _local.profiler = None
+    if METRICS_PORT:
+        start_http_server(METRICS_PORT)
+    if PROFILE_DIR:
+        _local.profiler = cProfile.Profile()
+        _local.profiler.enable()
+
+def end_rerun():
+    profiler = getattr(_local, 'profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(os.path.join(PROFILE_DIR, f"{_local.script}-{time.time():.3f}.prof"))
+        _local.profiler = None
+    observe('dashboard_rerun_seconds', time.perf_counter() - _local.started, script=_local.script)
+    if METRICS_FILE:
+        write_textfile(METRICS_FILE)
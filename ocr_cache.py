@@ -0,0 +1,116 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+import metrics
+
+# Maximum number of OCR results kept in memory
+OCR_CACHE_SIZE = int(os.environ.get("OCR_CACHE_SIZE", "512"))
+
+# Optional directory for the on-disk tier (empty disables it)
+OCR_CACHE_DIR = os.environ.get("OCR_CACHE_DIR", "")
+
+def content_key(data, namespace=""):
+    digest = hashlib.sha256(data).hexdigest()
+    return f"{namespace}-{digest}" if namespace else digest
+
+# Content-addressed cache of OCR text and verdicts: in-memory LRU plus optional disk tier
+class OCRResultCache:
+    def __init__(self, max_entries=OCR_CACHE_SIZE, cache_dir=OCR_CACHE_DIR):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir or None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[-2:], key + ".json")
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _read_disk(self, key):
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key, entry):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                metrics.inc('ocr_cache_lookups_total', outcome='memory_hit')
+                return entry
+        if self.cache_dir:
+            entry = self._read_disk(key)
+            if entry is not None:
+                with self._lock:
+                    self._remember(key, entry)
+                    self.disk_hits += 1
+                metrics.inc('ocr_cache_lookups_total', outcome='disk_hit')
+                return entry
+        with self._lock:
+            self.misses += 1
+        metrics.inc('ocr_cache_lookups_total', outcome='miss')
+        return None
+
+    def put(self, key, entry):
+        with self._lock:
+            self._remember(key, entry)
+        if self.cache_dir:
+            self._write_disk(key, entry)
+
+    def get_or_compute(self, data, compute, namespace=""):
+        key = content_key(data, namespace)
+        entry = self.get(key)
+        if entry is None:
+            entry = compute(data)
+            self.put(key, entry)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+_cache = None
+_cache_lock = threading.Lock()
+
+# Process-wide OCR result cache shared by all sessions
+def get_ocr_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = OCRResultCache()
+    return _cache
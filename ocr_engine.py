@@ -0,0 +1,86 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import metrics
+
+# Languages the shared OCR models are loaded for
+OCR_LANGUAGES = ['en']
+
+# Number of OCR worker processes (0 keeps OCR inside the server process)
+OCR_WORKERS = int(os.environ.get("OCR_WORKERS", "0"))
+
+# Reader owned by a pool worker process, loaded once by the pool initializer
+_worker_reader = None
+
+def _init_worker(languages):
+    global _worker_reader
+    import easyocr
+    _worker_reader = easyocr.Reader(languages)
+
+def _worker_readtext(image, kwargs):
+    return _worker_reader.readtext(image, **kwargs)
+
+# OCR engine that keeps the easyocr models loaded for the life of the process
+class OCREngine:
+    def __init__(self, languages=None, workers=OCR_WORKERS):
+        self.languages = list(languages or OCR_LANGUAGES)
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._reader = None
+        self._pool = None
+        if workers > 0:
+            # Spawn instead of fork: the Streamlit server is multi-threaded
+            self._pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.languages,),
+            )
+        else:
+            with metrics.timed('ocr_model_load_seconds', mode='local'):
+                # easyocr pulls in torch, so it is only imported once OCR is needed
+                import easyocr
+                self._reader = easyocr.Reader(self.languages)
+
+    def readtext(self, image, detail=0, **kwargs):
+        kwargs['detail'] = detail
+        if self._pool is not None:
+            # Includes the worker's one-off model load on its first image
+            with metrics.timed('ocr_inference_seconds', mode='pool'):
+                return self._pool.submit(_worker_readtext, image, kwargs).result()
+        # A single in-process reader is shared by every session thread
+        with self._lock, metrics.timed('ocr_inference_seconds', mode='local'):
+            return self._reader.readtext(image, **kwargs)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+_engine = None
+_engine_lock = threading.Lock()
+
+# Process-wide OCR engine, created on first use and reused by all sessions
+def get_ocr_engine():
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = OCREngine()
+    return _engine
+
+# Set OCR_PREWARM=1 to load the OCR models in the background after the first page render
+OCR_PREWARM = os.environ.get("OCR_PREWARM", "0") == "1"
+
+_prewarm_started = False
+
+def prewarm_ocr_engine():
+    global _prewarm_started
+    if not OCR_PREWARM or _prewarm_started or _engine is not None:
+        return
+    with _engine_lock:
+        if _prewarm_started:
+            return
+        _prewarm_started = True
+    threading.Thread(target=get_ocr_engine, name="ocr-prewarm", daemon=True).start()
@@ -0,0 +1,70 @@
+import re
+from urllib.parse import urlsplit, parse_qs
+
+from ocr_engine import get_ocr_engine
+from upi import upi_handle
+
+# UPI virtual payment address, e.g. name@okicici
+VPA_PATTERN = re.compile(r'[A-Za-z0-9.\-_]+@[A-Za-z]+')
+
+def decode_qr(image_bytes):
+    # OpenCV is imported on the first scan only
+    import cv2
+    import numpy as np
+    pixels = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+    if pixels is None:
+        return None
+    # QRCodeDetector is not thread-safe, and is cheap to build per call
+    payload, _, _ = cv2.QRCodeDetector().detectAndDecode(pixels)
+    return payload or None
+
+# Parse upi://pay?pa=...&pn=...&am=... into structured fields
+def parse_upi_uri(payload):
+    parts = urlsplit(payload.strip())
+    if parts.scheme.lower() != 'upi' or parts.netloc.lower() != 'pay':
+        return None
+    params = {key: values[0] for key, values in parse_qs(parts.query).items()}
+    if not params.get('pa'):
+        return None
+    try:
+        amount = float(params['am']) if 'am' in params else None
+    except ValueError:
+        amount = None
+    return {
+        'payee_address': params['pa'],
+        'payee_name': params.get('pn', ''),
+        'amount': amount,
+        'currency': params.get('cu', 'INR'),
+        'note': params.get('tn', ''),
+    }
+
+def _ocr_fallback(image_bytes):
+    for text in get_ocr_engine().readtext(image_bytes, detail=0):
+        upi = parse_upi_uri(text)
+        if upi:
+            return upi, text
+        match = VPA_PATTERN.search(text)
+        if match:
+            return {'payee_address': match.group(0), 'payee_name': '', 'amount': None, 'currency': 'INR', 'note': ''}, text
+    return None, None
+
+# Decode a UPI QR code, falling back to OCR only when the QR cannot be decoded
+def scan_upi_qr(image_bytes, valid_handles, ocr_fallback=True):
+    payload = decode_qr(image_bytes)
+    source = 'qr'
+    upi = parse_upi_uri(payload) if payload else None
+    if payload is None and ocr_fallback:
+        source = 'ocr'
+        upi, payload = _ocr_fallback(image_bytes)
+    valid_handle = bool(upi) and upi_handle(upi['payee_address']) in valid_handles
+    return {'source': source, 'payload': payload, 'upi': upi, 'valid_handle': valid_handle}
+
+# Scan a UPI QR code on the background job queue (the OCR fallback can take seconds)
+def submit_qr_job(image_bytes, valid_handles, retry=False):
+    from jobs import get_job_queue
+    from ocr_cache import content_key
+
+    def scan(progress):
+        progress('decoding QR code', 0.2)
+        return scan_upi_qr(image_bytes, valid_handles)
+    return get_job_queue().submit('upi_qr', content_key(image_bytes, "upi_qr"), scan, retry=retry)
@@ -0,0 +1,158 @@
+import os
+import json
+import threading
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+# Rule definitions, overridable without editing the dashboards
+RULES_PATH = os.environ.get(
+    "FRAUD_RULES_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "fraud_rules.json"),
+)
+
+COMPARISONS = {
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+    '==': np.equal,
+    '!=': np.not_equal,
+}
+
+# Maximum rules per set, one bit each in the hit mask (the top bit is kept for the anomaly model)
+MAX_RULES = 63
+
+def _column(batch, field):
+    if field in batch:
+        return batch[field]
+    if field == 'handle' and 'upi' in batch:
+        return '@' + batch['upi'].fillna('').astype(str).str.rpartition('@')[2].str.lower()
+    return None
+
+def _strings(values, lower):
+    values = values.fillna('').astype(str)
+    return values.str.lower() if lower else values
+
+# String tests run once per distinct value of a categorical column and are spread by code
+def _string_test(values, lower, test):
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Missing rows have code -1, which picks the trailing '' entry
+        categories = pd.Series(list(values.cat.categories) + [''], dtype=object)
+        return np.asarray(test(_strings(categories, lower)), dtype=bool)[values.array.codes]
+    return np.asarray(test(_strings(values, lower)), dtype=bool)
+
+def _numbers(values):
+    return pd.to_numeric(values, errors='coerce').to_numpy(dtype=float)
+
+def _none(batch):
+    return np.zeros(len(batch), dtype=bool)
+
+def _compile_field(cond):
+    field = cond['field']
+    op = cond['op']
+    lower = cond.get('lower', False)
+
+    if op in ('in', 'not_in'):
+        members = [str(v).lower() if lower else v for v in cond['values']]
+        negate = op == 'not_in'
+        def predicate(batch):
+            values = _column(batch, field)
+            if values is None:
+                return _none(batch)
+            hits = _string_test(values, lower, lambda strings: strings.isin(members))
+            # Missing values never hit, whichever way the list is used
+            return (~hits if negate else hits) & values.notna().to_numpy()
+        return predicate
+
+    if op == 'above_handle_limit':
+        # Per-handle amount ceilings; handles without a limit use the default (null = unlimited)
+        limits = {handle.lower(): limit for handle, limit in cond['limits'].items()}
+        default = cond.get('default')
+        def predicate(batch):
+            values = _column(batch, field)
+            handles = _column(batch, 'handle')
+            if values is None or handles is None:
+                return _none(batch)
+            ceilings = handles.map(limits).astype(float)
+            if default is not None:
+                ceilings = ceilings.fillna(default)
+            return _numbers(values) > ceilings.to_numpy(dtype=float)
+        return predicate
+
+    if op in COMPARISONS:
+        value = cond['value']
+        compare = COMPARISONS[op]
+        def predicate(batch):
+            values = _column(batch, field)
+            if values is None:
+                return _none(batch)
+            if isinstance(value, str):
+                target = value.lower() if lower else value
+                return _string_test(values, lower, lambda strings: compare(strings.to_numpy(dtype=object), target))
+            return compare(_numbers(values), value)
+        return predicate
+
+    raise ValueError(f"Unknown rule operator: {op!r}")
+
+# Compile a condition tree into a predicate mapping a DataFrame batch to a boolean array
+def compile_condition(cond):
+    if 'all' in cond:
+        parts = [compile_condition(c) for c in cond['all']]
+        return lambda batch: np.logical_and.reduce([p(batch) for p in parts]) if parts else ~_none(batch)
+    if 'any' in cond:
+        parts = [compile_condition(c) for c in cond['any']]
+        return lambda batch: np.logical_or.reduce([p(batch) for p in parts]) if parts else _none(batch)
+    if 'not' in cond:
+        part = compile_condition(cond['not'])
+        return lambda batch: ~part(batch)
+    if 'field' in cond and 'op' in cond:
+        return _compile_field(cond)
+    raise ValueError(f"Invalid rule condition: {cond!r}")
+
+# A compiled set of fraud rules evaluated over whole batches into per-transaction hit bitmasks
+class RuleSet:
+    def __init__(self, rules):
+        self.rules = [rule for rule in rules if rule.get('enabled', True)]
+        if len(self.rules) > MAX_RULES:
+            raise ValueError(f"At most {MAX_RULES} rules are supported, got {len(self.rules)}")
+        self.names = [rule['name'] for rule in self.rules]
+        self.severities = [rule.get('severity', 'medium') for rule in self.rules]
+        self.messages = [rule.get('message', 'Rule {rule} hit by transaction {id}') for rule in self.rules]
+        self._predicates = [compile_condition(rule['when']) for rule in self.rules]
+
+    def evaluate(self, batch):
+        masks = np.zeros(len(batch), dtype=np.uint64)
+        for bit, predicate in enumerate(self._predicates):
+            masks |= predicate(batch).astype(np.uint64) << np.uint64(bit)
+        return masks
+
+    def hit_rules(self, mask):
+        mask = int(mask)
+        return [bit for bit in range(len(self.rules)) if mask >> bit & 1]
+
+    def format_message(self, bit, record):
+        fields = defaultdict(str, {
+            key: int(value) if isinstance(value, float) and value.is_integer() else value
+            for key, value in record.items()
+        })
+        fields['rule'] = self.names[bit]
+        return self.messages[bit].format_map(fields)
+
+def load_rules(path=RULES_PATH):
+    with open(path, encoding="utf-8") as f:
+        return RuleSet(json.load(f)['rules'])
+
+_rules = {}
+_rules_lock = threading.Lock()
+
+# Compiled rules for a config file, recompiled only when the file changes
+def get_rules(path=RULES_PATH):
+    mtime = os.path.getmtime(path)
+    with _rules_lock:
+        cached = _rules.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, load_rules(path))
+            _rules[path] = cached
+        return cached[1]
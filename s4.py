@@ -1,72 +1,92 @@
 import streamlit as st
-import pandas as pd
-import re
-import google.generativeai as genai
-import easyocr
-from PIL import Image
-import io
+from qr_decoder import submit_qr_job
+from transaction_table import render_transaction_table
+from transaction_store import get_transaction_store
+from upi import is_valid_upi, valid_upi_handles
+import metrics
+from aadhar import submit_aadhar_job, format_timings
+from jobs import QueueFull
+from job_panel import render_job_progress
+from ocr_engine import prewarm_ocr_engine
 
-# Set up Gemini API key
-genai.configure(api_key="YOUR_GEMINI_API_KEY")
+# Time this rerun stage by stage
+metrics.begin_rerun("s4")
 
-# Initialize session state for transactions if not already present
-if 'transactions' not in st.session_state:
-    st.session_state.transactions = []
+# Transactions persist in a shared store across sessions and restarts
+store = get_transaction_store()
+
+# Initialize session state if not already present
 if 'aadhar_verified' not in st.session_state:
     st.session_state.aadhar_verified = False
 
-# List of valid UPI handles in India
-valid_upi_handles = {
-    "@sbi", "@imobile", "@pockets", "@ezeepay", "@eazypay", "@icici", "@okicici",
-    "@hdfcbank", "@payzapp", "@okhdfcbank", "@rajgovhdfcbank", "@mahb", "@kotak",
-    "@kaypay", "@kmb", "@kmbl", "@yesbank", "@yesbankltd", "@ubi", "@united",
-    "@utbi", "@idbi", "@idbibank", "@hsbc", "@pnb", "@centralbank", "@cbin",
-    "@cboi", "@cnrb", "@barodampay"
-}
-
-def is_valid_upi(upi_id):
-    return any(upi_id.endswith(handle) for handle in valid_upi_handles)
-
 def add_sample_data():
-    new_id = f'TXN{len(st.session_state.transactions) + 1}'
+    new_id = f'TXN{store.last_seq() + 1}'
     upi_id = st.text_input("Enter UPI ID for transaction:", key=f'upi_input_{new_id}')
     if st.button("Submit UPI", key=f'submit_{new_id}'):
         if is_valid_upi(upi_id):
-            st.session_state.transactions.append({'id': new_id, 'status': 'Pending', 'upi': upi_id})
+            store.add(upi_id)
             st.rerun()
         else:
             st.error("Invalid UPI ID. Please enter a valid UPI ID based in India.")
 
-def validate_transaction(index):
-    st.session_state.transactions[index]['status'] = 'Validated'
-    st.rerun()
-
 # Aadhar Verification Prototype
 def verify_aadhar():
     uploaded_file = st.file_uploader("Upload Aadhar Card Image", type=["jpg", "jpeg", "png"])
     if uploaded_file:
-        image = Image.open(uploaded_file)
-        reader = easyocr.Reader(['en'])
-        result = reader.readtext(io.BytesIO(uploaded_file.getvalue()), detail=0)
-        
-        for text in result:
-            if re.match(r'\d{4} \d{4} \d{4}', text):
-                st.success("✅ Aadhar Verified Successfully!")
-                st.session_state.aadhar_verified = True
-                return
+        # OCR runs on the background job queue; reruns attach to the same job while it runs
+        try:
+            job = submit_aadhar_job(uploaded_file.getvalue())
+        except QueueFull:
+            st.warning("⏳ Too many verifications in progress. Please try again in a moment.")
+            return
+        if not render_job_progress(job):
+            return
+        if job.error:
+            st.error(f"❌ Aadhar verification failed: {job.error}")
+            # Failed jobs stay attached across reruns; only this button starts a new attempt
+            if st.button("🔄 Retry", key="aadhar_retry"):
+                try:
+                    submit_aadhar_job(uploaded_file.getvalue(), retry=True)
+                except QueueFull:
+                    st.warning("⏳ Too many verifications in progress. Please try again in a moment.")
+                    return
+                st.rerun()
+            return
+        result = job.result
+        st.caption(f"⏱️ {format_timings(result['timings'])}")
+        if result['verdict']:
+            st.success("✅ Aadhar Verified Successfully!")
+            st.session_state.aadhar_verified = True
+            return
         st.error("❌ Invalid Aadhar Card. Please upload a valid document.")
 
 # Bank Details Linking with QR Code Scanner
 def scan_qr_code():
     uploaded_qr = st.file_uploader("Upload QR Code Image for Bank Linking", type=["jpg", "jpeg", "png"], key="qr")
     if uploaded_qr:
-        reader = easyocr.Reader(['en'])
-        result = reader.readtext(io.BytesIO(uploaded_qr.getvalue()), detail=0)
-        
-        for text in result:
-            if "upi" in text.lower():
-                st.success(f"✅ Bank Details Linked: {text}")
-                return
+        try:
+            job = submit_qr_job(uploaded_qr.getvalue(), valid_upi_handles)
+        except QueueFull:
+            st.warning("⏳ Too many verifications in progress. Please try again in a moment.")
+            return
+        if not render_job_progress(job):
+            return
+        if job.error:
+            st.error(f"❌ QR scan failed: {job.error}")
+            if st.button("🔄 Retry", key="qr_retry"):
+                try:
+                    submit_qr_job(uploaded_qr.getvalue(), valid_upi_handles, retry=True)
+                except QueueFull:
+                    st.warning("⏳ Too many verifications in progress. Please try again in a moment.")
+                    return
+                st.rerun()
+            return
+        result = job.result
+        upi = result['upi']
+        if upi and result['valid_handle']:
+            payee = f"{upi['payee_name']} ({upi['payee_address']})" if upi['payee_name'] else upi['payee_address']
+            st.success(f"✅ Bank Details Linked: {payee}")
+            return
         st.error("❌ Invalid QR Code. Please upload a valid UPI-linked QR Code.")
 
 # Streamlit UI
@@ -94,28 +114,28 @@ st.markdown("""
 
 # Aadhar Verification
 st.subheader("🆔 Aadhar Verification")
-verify_aadhar()
+with metrics.stage("aadhar"):
+    verify_aadhar()
 
 # Bank Linking with QR Scanner
 st.subheader("🏦 Bank Linking via QR Code")
-scan_qr_code()
+with metrics.stage("qr_code"):
+    scan_qr_code()
 
 # Display transactions as a table
 st.subheader("📋 Transaction Reports")
-if st.session_state.transactions:
-    df = pd.DataFrame(st.session_state.transactions)
-    st.dataframe(df, width=700)
-    
-    for i, row in df.iterrows():
-        col1, col2, col3, col4 = st.columns([3, 2, 2, 3])
-        col1.write(f"**{row['id']}**")
-        col2.write(f"🚦 {row['status']}")
-        col3.write(f"💰 {row['upi']}")
-        if col4.button("✅ Validate", key=f'btn_{i}'):
-            validate_transaction(i)
-else:
-    st.info("No transactions available. Add a new transaction with a valid UPI ID.")
+with metrics.stage("report"):
+    if not store.is_empty():
+        render_transaction_table(store, ['id', 'status', 'upi'])
+    else:
+        st.info("No transactions available. Add a new transaction with a valid UPI ID.")
 
 # Add sample data button
 st.markdown("### 📌 Actions")
-add_sample_data()
+with metrics.stage("actions"):
+    add_sample_data()
+
+metrics.end_rerun()
+
+# Load the OCR models in the background now that the page has rendered
+prewarm_ocr_engine()
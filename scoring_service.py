@@ -0,0 +1,226 @@
+import json
+import time
+import queue
+import argparse
+import threading
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+import metrics
+from upi import validate_upi_bulk
+from fraud_monitor import FraudMonitor
+from velocity import VelocityTracker
+from travel import TravelTracker
+from fraud_ring import RingTracker
+from anomaly_model import get_anomaly_model
+from transaction_store import parse_amount, parse_timestamp
+
+# Largest coalesced batch, and how long the first request waits for company (seconds)
+MAX_BATCH = 512
+MAX_WAIT = 0.002
+
+# Longest a request waits for its batch to be scored (seconds)
+REQUEST_TIMEOUT = 10.0
+
+# Largest request body accepted (bytes)
+MAX_BODY = 16 * 2 ** 20
+
+# Fields a scoring request may carry; anything else is dropped before scoring
+TEXT_FIELDS = ('id', 'upi', 'location', 'payee', 'status')
+
+# Validate one request transaction: returns (record, None), or (None, error) for bad input
+def clean_record(record):
+    if not isinstance(record, dict):
+        return None, "expected a transaction object"
+    if not isinstance(record.get('upi'), str) or not record['upi']:
+        return None, "'upi' must be a non-empty string"
+    clean = {}
+    for field in TEXT_FIELDS:
+        value = record.get(field)
+        if value is None:
+            continue
+        if isinstance(value, (dict, list, bool)):
+            return None, f"'{field}' must be a string"
+        clean[field] = str(value)
+    for field, parse in (('amount', parse_amount), ('created_at', parse_timestamp)):
+        value = record.get(field)
+        if value is None:
+            continue
+        try:
+            clean[field] = parse(value)
+        except (TypeError, ValueError, OverflowError) as e:
+            return None, f"'{field}' is invalid: {e}"
+    return clean, None
+
+# Coalesces concurrent scoring requests into one vectorized batch on a single scorer thread,
+# which also owns the warm rule set and velocity state.
+class MicroBatcher:
+    def __init__(self, monitor, max_batch=MAX_BATCH, max_wait=MAX_WAIT):
+        self.monitor = monitor
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._ids = iter(range(1, 2 ** 63))
+        threading.Thread(target=self._loop, name="scoring-batcher", daemon=True).start()
+
+    def submit(self, records):
+        future = Future()
+        self._queue.put((records, future))
+        return future
+
+    def _collect(self):
+        items = [self._queue.get()]
+        size = len(items[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            items.append(item)
+            size += len(item[0])
+        return items
+
+    def _loop(self):
+        while True:
+            items = self._collect()
+            records = [record for batch, _ in items for record in batch]
+            try:
+                results = self.score(records)
+            except Exception:
+                # Bad input is rejected before it is queued, so this only guards against unexpected
+                # failures: score the requests one by one so one cannot fail the others
+                for batch, future in items:
+                    try:
+                        future.set_result(self.score(batch))
+                    except Exception as e:
+                        future.set_exception(e)
+                continue
+            offset = 0
+            for batch, future in items:
+                future.set_result(results[offset:offset + len(batch)])
+                offset += len(batch)
+
+    def score(self, records):
+        metrics.inc('scoring_batches_total')
+        metrics.inc('scoring_transactions_total', len(records))
+        for record in records:
+            if 'id' not in record:
+                record['id'] = f"REQ{next(self._ids)}"
+        batch = pd.DataFrame.from_records(records)
+        valid_upi = validate_upi_bulk(batch['upi'])
+        masks, hits = self.monitor.score(batch)
+        results = []
+        for row, record in enumerate(records):
+            row_hits = hits.get(row, [])
+            results.append({
+                'id': record['id'],
+                'valid_upi': bool(valid_upi[row]),
+                'fraud': bool(masks[row]),
+                'rules': [rule for rule, _, _, _ in row_hits],
+                'severity': [severity for _, severity, _, _ in row_hits],
+                'alerts': [message for _, _, message, _ in row_hits],
+            })
+        return results
+
+class ScoringServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Many load-generator connections arrive at once; the default backlog of 5 drops them
+    request_queue_size = 1024
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status, payload, content_type="application/json"):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {'status': 'ok'})
+        elif self.path == "/metrics":
+            self._send(200, metrics.render().encode(), "text/plain; version=0.0.4")
+        else:
+            self._send(404, {'error': 'not found'})
+
+    def do_POST(self):
+        start = time.perf_counter()
+        length = int(self.headers.get("Content-Length", 0))
+        if length > MAX_BODY:
+            self._send(413, {'error': 'request body too large'})
+            return
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError:
+            self._send(400, {'error': 'invalid JSON'})
+            return
+
+        if self.path == "/score":
+            records = [body]
+        elif self.path == "/score/batch":
+            records = body.get('transactions') if isinstance(body, dict) else body
+        else:
+            self._send(404, {'error': 'not found'})
+            return
+        if not isinstance(records, list) or not records:
+            self._send(400, {'error': "expected transaction objects with a 'upi' field"})
+            return
+        cleaned = []
+        for i, record in enumerate(records):
+            record, error = clean_record(record)
+            if error:
+                self._send(400, {'error': error if self.path == "/score" else f"transaction {i}: {error}"})
+                return
+            cleaned.append(record)
+        records = cleaned
+
+        try:
+            results = self.server.batcher.submit(records).result(timeout=REQUEST_TIMEOUT)
+        except TimeoutError:
+            self._send(503, {'error': 'scoring timed out'})
+            return
+        except Exception as e:
+            self._send(500, {'error': str(e)})
+            return
+        self._send(200, results[0] if self.path == "/score" else {'results': results})
+        metrics.observe('scoring_request_seconds', time.perf_counter() - start, endpoint=self.path)
+
+    def log_message(self, format, *args):
+        pass
+
+def make_server(host, port, max_batch=MAX_BATCH, max_wait=MAX_WAIT, shards=0):
+    server = ScoringServer((host, port), ScoringHandler)
+    if shards:
+        from sharded_scoring import ShardedFraudMonitor
+        monitor = ShardedFraudMonitor(shards)
+    else:
+        monitor = FraudMonitor(velocity=VelocityTracker(), travel=TravelTracker(), rings=RingTracker(), model=get_anomaly_model())
+    server.batcher = MicroBatcher(monitor, max_batch, max_wait)
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless fraud-scoring HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT * 1000)
+    parser.add_argument("--shards", type=int, default=0, help="score in this many worker processes sharded by UPI ID")
+    args = parser.parse_args(argv)
+    server = make_server(args.host, args.port, args.max_batch, args.max_wait_ms / 1000, args.shards)
+    print(f"scoring on http://{args.host}:{args.port} (POST /score, POST /score/batch, GET /metrics)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
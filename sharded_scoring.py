@@ -0,0 +1,237 @@
+import os
+import sys
+import json
+import time
+import zlib
+import argparse
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from fraud_monitor import FraudMonitor
+from rule_engine import RULES_PATH
+from anomaly_model import ANOMALY_COMBINE
+from fraud_ring import RingTracker
+
+# Worker processes used when no shard count is given
+SHARDS = int(os.environ.get("SCORING_SHARDS", "0")) or os.cpu_count() or 1
+
+# Shared memory segments start at this size and double when a batch does not fit
+MIN_SEGMENT = 1 << 20
+
+def _align(offset, to=8):
+    return (offset + to - 1) // to * to
+
+def shard_of(upis, shards):
+    # crc32 is stable across processes and runs, unlike hash() on str
+    codes, uniques = pd.factorize(pd.Series(upis, dtype=object))
+    hashes = np.array([zlib.crc32(str(upi).encode()) % shards for upi in uniques] + [0], dtype=np.int64)
+    return hashes[codes]
+
+# Shard worker: owns the FraudMonitor (and its velocity/travel state) for its slice of UPI IDs.
+# Each request names a shared memory segment holding an Arrow IPC stream of the shard's rows;
+# the rule-hit masks are written back into the same segment after the stream.
+def _worker(conn, rules_path, velocity, travel, model, combine):
+    import pyarrow as pa
+    from velocity import VelocityTracker
+    from travel import TravelTracker
+    from anomaly_model import get_anomaly_model
+
+    monitor = FraudMonitor(
+        rules_path,
+        velocity=VelocityTracker() if velocity else None,
+        travel=TravelTracker() if travel else None,
+        model=get_anomaly_model() if model else None,
+        combine=combine,
+    )
+    segment = None
+    while True:
+        request = conn.recv()
+        if request is None:
+            break
+        name, length, rows = request
+        try:
+            if segment is None or segment.name != name:
+                if segment is not None:
+                    segment.close()
+                # Spawned workers share the parent's resource tracker, which unlinks on the parent's side
+                segment = shared_memory.SharedMemory(name=name)
+            batch = pa.ipc.open_stream(pa.py_buffer(segment.buf[:length])).read_all().to_pandas()
+            masks, hits = monitor.score(batch)
+            out = np.ndarray(rows, dtype=np.uint64, buffer=segment.buf, offset=_align(length))
+            out[:] = masks
+            del batch, out
+            conn.send({
+                int(row): [(rule, severity, message, record) for rule, severity, message, record in row_hits]
+                for row, row_hits in hits.items()
+            })
+        except Exception as e:
+            # Drop every view of the segment, including those held by the traceback's frames,
+            # so the segment can still be closed once the parent moves on or shuts down
+            batch = out = None
+            e.__traceback__ = None
+            conn.send(e)
+    if segment is not None:
+        segment.close()
+
+class _Shard:
+    def __init__(self, index, context, rules_path, velocity, travel, model, combine):
+        self.index = index
+        self.conn, child = context.Pipe()
+        self.process = context.Process(
+            target=_worker, args=(child, rules_path, velocity, travel, model, combine),
+            name=f"fraud-shard-{index}", daemon=True,
+        )
+        self.process.start()
+        child.close()
+        self.segment = None
+
+    def segment_for(self, size):
+        if self.segment is None or self.segment.size < size:
+            if self.segment is not None:
+                self.segment.close()
+                self.segment.unlink()
+            capacity = MIN_SEGMENT
+            while capacity < size:
+                capacity *= 2
+            self.segment = shared_memory.SharedMemory(create=True, size=capacity)
+        return self.segment
+
+    # Write an Arrow table as an IPC stream straight into shared memory and hand it to the worker
+    def submit(self, table):
+        import pyarrow as pa
+
+        sink = pa.MockOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        length = sink.size()
+        segment = self.segment_for(_align(length) + table.num_rows * 8)
+        stream = pa.FixedSizeBufferWriter(pa.py_buffer(segment.buf))
+        with pa.ipc.new_stream(stream, table.schema) as writer:
+            writer.write_table(table)
+        del stream
+        self.conn.send((segment.name, length, table.num_rows))
+        return length
+
+    def result(self, length, rows):
+        hits = self.conn.recv()
+        if isinstance(hits, Exception):
+            raise hits
+        masks = np.ndarray(rows, dtype=np.uint64, buffer=self.segment.buf, offset=_align(length)).copy()
+        return masks, hits
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=5)
+        if self.segment is not None:
+            self.segment.close()
+            self.segment.unlink()
+            self.segment = None
+
+# FraudMonitor whose scoring is sharded by UPI ID across worker processes. Each worker keeps
+# the per-key velocity and travel state for its shard, batches travel through shared memory
+# as Arrow buffers, and masks and hits are merged back in the original row order.
+# Alert dedup, the alert index and explanations stay in this process, and so does the fraud-ring
+# graph, which spans payers of every shard; with model=True each worker loads the trained
+# anomaly model itself.
+class ShardedFraudMonitor(FraudMonitor):
+    def __init__(self, shards=SHARDS, rules_path=RULES_PATH, velocity=True, travel=True, rings=True, explainer=None, model=True, combine=ANOMALY_COMBINE):
+        super().__init__(rules_path, rings=RingTracker() if rings else None, explainer=explainer, combine=combine)
+        # Spawn instead of fork: callers such as the Streamlit server are multi-threaded
+        context = multiprocessing.get_context("spawn")
+        self.shards = [_Shard(i, context, rules_path, velocity, travel, model, combine) for i in range(shards)]
+
+    def score(self, batch):
+        import pyarrow as pa
+
+        metrics.inc('fraud_transactions_scanned_total', len(batch))
+        if self.rings is not None:
+            batch = self.rings.observe(batch)
+        shard = shard_of(batch['upi'], len(self.shards))
+        # Convert every slice before sending any, so a batch Arrow rejects reaches no worker
+        slices = []
+        for worker in self.shards:
+            rows = np.flatnonzero(shard == worker.index)
+            if len(rows):
+                slices.append((worker, rows, pa.Table.from_pandas(batch.iloc[rows], preserve_index=False)))
+        # Send every shard its rows first so the workers score in parallel
+        pending = []
+        error = None
+        try:
+            for worker, rows, table in slices:
+                pending.append((worker, rows, worker.submit(table)))
+        except Exception as e:
+            error = e
+        masks = np.zeros(len(batch), dtype=np.uint64)
+        hits = {}
+        # Every reply is read even after a failure, or that shard's pipe would stay one reply behind
+        for worker, rows, length in pending:
+            try:
+                shard_masks, shard_hits = worker.result(length, len(rows))
+            except Exception as e:
+                error = error or e
+                continue
+            masks[rows] = shard_masks
+            for row, row_hits in shard_hits.items():
+                hits[rows[row]] = row_hits
+        if error is not None:
+            raise error
+        return masks, hits
+
+    def close(self):
+        for worker in self.shards:
+            worker.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Throughput of in-process scoring versus the sharded monitor on synthetic transactions
+def main(argv=None):
+    from synthetic_data import generate_transactions
+    from velocity import VelocityTracker
+    from travel import TravelTracker
+    from anomaly_model import get_anomaly_model
+
+    parser = argparse.ArgumentParser(description="Benchmark sharded fraud scoring")
+    parser.add_argument("--transactions", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=10_000)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    transactions = generate_transactions(args.transactions, seed=args.seed).drop(columns=['is_fraud'])
+    batches = [transactions.iloc[i:i + args.batch] for i in range(0, len(transactions), args.batch)]
+
+    def run(monitor):
+        start = time.perf_counter()
+        flagged = sum(int(np.count_nonzero(monitor.score(batch)[0])) for batch in batches)
+        return time.perf_counter() - start, flagged
+
+    # Separate warm-up rows so worker start-up and imports are not timed
+    warm_up = generate_transactions(100, seed=args.seed + 1).drop(columns=['is_fraud'])
+
+    results = []
+    elapsed, flagged = run(FraudMonitor(velocity=VelocityTracker(), travel=TravelTracker(), rings=RingTracker(), model=get_anomaly_model()))
+    results.append({'mode': 'in-process', 'shards': 0, 'seconds': elapsed, 'flagged': flagged})
+    for shards in args.shards:
+        with ShardedFraudMonitor(shards) as monitor:
+            monitor.score(warm_up)
+            elapsed, flagged = run(monitor)
+        results.append({'mode': 'sharded', 'shards': shards, 'seconds': elapsed, 'flagged': flagged})
+    for result in results:
+        result['rows_per_sec'] = round(args.transactions / result['seconds'])
+        result['seconds'] = round(result['seconds'], 3)
+    json.dump({'cpus': os.cpu_count(), 'results': results}, sys.stdout, indent=2)
+    print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from upi import valid_upi_handles
+from kyc import GSTIN_CHARS, _GSTIN_VALUES, _GSTIN_FACTORS
+
+HANDLES = np.array(sorted(valid_upi_handles))
+
+# Cities weighted roughly by UPI volume; the first three are the monitored allowlist
+CITIES = np.array(['Mumbai', 'Delhi', 'Bangalore', 'Pune', 'Chennai', 'Hyderabad', 'Kolkata', 'Ahmedabad', 'Jaipur', 'Lucknow'])
+CITY_WEIGHTS = np.array([0.24, 0.22, 0.2, 0.07, 0.06, 0.06, 0.05, 0.04, 0.03, 0.03])
+RARE_CITIES = np.array(['Imphal', 'Port Blair', 'Leh', 'Kohima', 'Aizawl'])
+
+# Share of payments that are transfers to another user rather than to a merchant
+P2P_RATE = 0.01
+
+# Injected mule rings: victims pay fresh mule accounts, which forward to one collector
+RING_MULES = 8
+RING_VICTIMS = 24
+RING_PAYMENTS = 40
+RING_SPAN = 400
+
+LETTERS = np.frombuffer(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ", dtype=np.uint8)
+DIGITS = np.frombuffer(b"0123456789", dtype=np.uint8)
+GSTIN_ALPHABET = np.frombuffer(GSTIN_CHARS.encode("ascii"), dtype=np.uint8)
+
+def _strings(matrix):
+    width = matrix.shape[1]
+    return np.ascontiguousarray(matrix).view(f"S{width}").ravel().astype(str)
+
+def upi_ids(n_users, rng):
+    # Half phone-number VPAs, half name-style VPAs
+    phones = rng.integers(6_000_000_000, 9_999_999_999, n_users).astype(str)
+    names = np.char.add("user", rng.integers(0, 10 * n_users, n_users).astype(str))
+    local = np.where(rng.random(n_users) < 0.5, phones, names)
+    return np.char.add(local, rng.choice(HANDLES, n_users))
+
+# One mule ring within RING_SPAN consecutive rows: victims pay the mules, mules pay the collector
+def _inject_ring(rng, users, upi, payee, amount, location, fraud):
+    mules = upi_ids(RING_MULES + 1, rng)
+    mules, collector = mules[:-1], mules[-1]
+    victims = users[rng.choice(len(users), min(RING_VICTIMS, len(users)), replace=False)]
+    start = rng.integers(0, len(upi) - RING_SPAN + 1)
+    rows = start + np.sort(rng.choice(RING_SPAN, RING_PAYMENTS, replace=False))
+    paid, forwarded = rows[:len(rows) * 3 // 4], rows[len(rows) * 3 // 4:]
+    upi[paid] = victims[np.arange(len(paid)) % len(victims)]
+    payee[paid] = mules[np.arange(len(paid)) % len(mules)]
+    upi[forwarded] = mules[np.arange(len(forwarded)) % len(mules)]
+    payee[forwarded] = collector
+    amount[rows] = rng.integers(5_000, 20_000, len(rows))
+    location[rows] = rng.choice(CITIES[:3], len(rows))
+    fraud[rows] = True
+
+# Seeded synthetic transactions with injected fraud (labelled in is_fraud)
+def generate_transactions(n, seed=0, fraud_rate=0.02, start=None, rate_per_sec=500.0):
+    rng = np.random.default_rng(seed)
+    start = time.time() if start is None else start
+    users = upi_ids(max(100, n // 20), rng)
+    # Activity is skewed: a few payers make many transactions
+    payer = np.minimum(rng.zipf(1.3, n) - 1, len(users) - 1)
+    amount = np.clip(rng.lognormal(7.0, 1.2, n), 1, 45000).round()
+    # Each payer transacts from a home city, so only injected fraud looks like travel
+    home = rng.choice(CITIES, len(users), p=CITY_WEIGHTS)
+    # Object dtype: a fixed-width copy would truncate longer injected names like "Port Blair"
+    location = home[payer].astype(object)
+    created_at = start + np.cumsum(rng.exponential(1.0 / rate_per_sec, n))
+
+    fraud = rng.random(n) < fraud_rate
+    kind = rng.integers(0, 3, n)
+    big = fraud & (kind == 0)
+    amount[big] = rng.integers(50_001, 500_000, big.sum())
+    far = fraud & (kind == 1)
+    location[far] = rng.choice(RARE_CITIES, far.sum())
+    # Account-takeover style: a burst of mid-size payments from one payer
+    burst = fraud & (kind == 2)
+    amount[burst] = rng.integers(20_000, 49_999, burst.sum())
+    payer[burst] = rng.integers(0, 10, burst.sum())
+    location[burst] = home[payer[burst]]
+
+    # Payees: mostly a few busy merchants, sometimes a transfer to another user
+    merchants = upi_ids(max(10, n // 5000), rng)
+    payee = merchants[rng.integers(0, len(merchants), n)].astype(object)
+    p2p = rng.random(n) < P2P_RATE
+    payee[p2p] = users[rng.integers(0, len(users), p2p.sum())]
+    upi = users[payer].astype(object)
+    if n >= RING_SPAN:
+        for _ in range(max(1, n // 20_000)):
+            _inject_ring(rng, users, upi, payee, amount, location, fraud)
+
+    return pd.DataFrame({
+        'id': np.char.add("TXN", np.arange(1, n + 1).astype(str)),
+        'status': 'Pending',
+        'upi': upi,
+        'payee': payee,
+        'amount': amount.astype(np.int64),
+        'location': location,
+        'created_at': created_at,
+        'is_fraud': fraud,
+    })
+
+def _pan_matrix(n, rng):
+    return np.hstack([
+        rng.choice(LETTERS, (n, 5)),
+        rng.choice(DIGITS, (n, 4)),
+        rng.choice(LETTERS, (n, 1)),
+    ])
+
+# Seeded synthetic KYC records; invalid_rate of each field is corrupted
+def generate_kyc(n, seed=0, invalid_rate=0.05):
+    rng = np.random.default_rng(seed)
+    pan = _pan_matrix(n, rng)
+    state = rng.integers(1, 38, n)
+    gstin = np.hstack([
+        DIGITS[state // 10][:, None],
+        DIGITS[state % 10][:, None],
+        _pan_matrix(n, rng),
+        rng.choice(DIGITS[1:], (n, 1)),
+        np.full((n, 1), ord('Z'), dtype=np.uint8),
+        np.zeros((n, 1), dtype=np.uint8),
+    ])
+    products = _GSTIN_VALUES[gstin[:, :14]] * _GSTIN_FACTORS
+    totals = (products // 36 + products % 36).sum(axis=1)
+    gstin[:, 14] = GSTIN_ALPHABET[(36 - totals % 36) % 36]
+    account = rng.integers(10 ** 9, 10 ** 16, n).astype(str)
+
+    records = pd.DataFrame({
+        'customer_id': np.arange(1, n + 1),
+        'pan': _strings(pan),
+        'gstin': _strings(gstin),
+        'account': account,
+        'upi': upi_ids(n, rng),
+    })
+    for column, broken in (('pan', 'ABC12'), ('gstin', '22AAAAA0000A1Z0'), ('account', '12AB'), ('upi', 'someone@@sbi')):
+        records.loc[rng.random(n) < invalid_rate, column] = broken
+    return records
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write seeded synthetic transactions or KYC records")
+    parser.add_argument("kind", choices=["transactions", "kyc"])
+    parser.add_argument("rows", type=int)
+    parser.add_argument("output", help=".csv, .jsonl or .parquet")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    df = generate_transactions(args.rows, args.seed) if args.kind == "transactions" else generate_kyc(args.rows, args.seed)
+    if args.output.endswith(".jsonl"):
+        df.to_json(args.output, orient="records", lines=True)
+    elif args.output.endswith(".parquet"):
+        df.to_parquet(args.output, index=False)
+    else:
+        df.to_csv(args.output, index=False)
+    print(f"{len(df)} {args.kind} written to {args.output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+import time
+import threading
+
+import numpy as np
+import pandas as pd
+
+from transaction_store import COLUMNS, txn_id
+
+# Rows allocated up front; arrays double when full
+INITIAL_CAPACITY = 1024
+
+def _code_dtype(n_categories):
+    # The code width pandas picks for a Categorical, so frames can wrap the codes without a copy
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+# An append-only string column stored as integer codes into a dictionary of distinct values
+class InternedColumn:
+    def __init__(self, capacity):
+        self.values = []
+        self.lookup = {}
+        self.codes = np.full(capacity, -1, dtype=np.int8)
+        self._categories = None
+
+    def _intern(self, values):
+        for value in values:
+            if value not in self.lookup:
+                self.lookup[value] = len(self.values)
+                self.values.append(value)
+                self._categories = None
+        dtype = _code_dtype(len(self.values))
+        if self.codes.dtype != dtype:
+            self.codes = self.codes.astype(dtype)
+
+    def code(self, value):
+        return self.lookup.get(value, -1)
+
+    # Codes for new values, one dictionary probe per distinct value; missing values are -1
+    def encode(self, values):
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+        self._intern(uniques)
+        mapped = np.array([self.lookup[value] for value in uniques] + [-1], dtype=np.int64)
+        return mapped[codes]
+
+    def resize(self, capacity):
+        codes = np.full(capacity, -1, dtype=self.codes.dtype)
+        codes[:len(self.codes)] = self.codes
+        self.codes = codes
+
+    @property
+    def categories(self):
+        if self._categories is None:
+            self._categories = pd.Index(self.values, dtype=object)
+        return self._categories
+
+    # Categorical over rows [start, stop) that shares the code array
+    def view(self, start, stop):
+        return pd.Categorical.from_codes(self.codes[start:stop], categories=self.categories, validate=False)
+
+    # Per-row result of a test on each distinct value (missing rows are False)
+    def test(self, predicate, rows):
+        hits = np.array([predicate(value) for value in self.values] + [False], dtype=bool)
+        return hits[self.codes[rows]]
+
+# In-memory columnar transaction store with the TransactionStore interface.
+# Ids are the integer sequence numbers (shown as TXN<seq>), status, UPI ID, handle, location
+# and payee are interned codes, and amount and created_at are float arrays, about 28 bytes a
+# row. since() returns DataFrames whose columns are views of the arrays, so the fraud monitor
+# reads new rows without copying; query() only materializes the rows of one report page.
+class TransactionColumns:
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        self._n = 0
+        self._lock = threading.Lock()
+        self.status = InternedColumn(capacity)
+        self.upi = InternedColumn(capacity)
+        self.handle = InternedColumn(capacity)
+        self.location = InternedColumn(capacity)
+        self.payee = InternedColumn(capacity)
+        self.amount = np.full(capacity, np.nan)
+        self.created_at = np.zeros(capacity)
+
+    def __len__(self):
+        return self._n
+
+    def _interned(self):
+        return (self.status, self.upi, self.handle, self.location, self.payee)
+
+    def _reserve(self, rows):
+        capacity = len(self.amount)
+        if self._n + rows <= capacity:
+            return
+        while capacity < self._n + rows:
+            capacity *= 2
+        for column in self._interned():
+            column.resize(capacity)
+        for name in ('amount', 'created_at'):
+            array = np.full(capacity, np.nan) if name == 'amount' else np.zeros(capacity)
+            array[:self._n] = getattr(self, name)[:self._n]
+            setattr(self, name, array)
+
+    def nbytes(self):
+        arrays = [column.codes for column in self._interned()] + [self.amount, self.created_at]
+        return sum(array.itemsize for array in arrays) * self._n
+
+    def add(self, upi, amount=None, location=None, status='Pending', payee=None):
+        self.add_many([{'upi': upi, 'amount': amount, 'location': location, 'status': status, 'payee': payee}])
+        return txn_id(self._n)
+
+    # Append many transactions from a list of dicts or a DataFrame; ids are always assigned in order
+    def add_many(self, records):
+        batch = records if isinstance(records, pd.DataFrame) else pd.DataFrame.from_records(list(records))
+        rows = len(batch)
+        if not rows:
+            return
+        upis = batch['upi'].astype(object)
+        handles = upis.str.rpartition('@')[2].str.lower()
+        handles = ('@' + handles).where(upis.str.contains('@', regex=False, na=False))
+        column = lambda name, default: batch[name] if name in batch else pd.Series(default, index=batch.index, dtype=object)
+        with self._lock:
+            self._reserve(rows)
+            start, stop = self._n, self._n + rows
+            self.status.codes[start:stop] = self.status.encode(column('status', 'Pending').fillna('Pending'))
+            self.upi.codes[start:stop] = self.upi.encode(upis)
+            self.handle.codes[start:stop] = self.handle.encode(handles)
+            self.location.codes[start:stop] = self.location.encode(column('location', None))
+            self.payee.codes[start:stop] = self.payee.encode(column('payee', None))
+            self.amount[start:stop] = pd.to_numeric(column('amount', None), errors='coerce').to_numpy(dtype=np.float64)
+            created_at = column('created_at', None)
+            self.created_at[start:stop] = pd.to_numeric(created_at, errors='coerce').fillna(time.time()).to_numpy(dtype=np.float64)
+            self._n = stop
+
+    def _rows(self, txn_ids):
+        seqs = pd.to_numeric(pd.Series(list(txn_ids), dtype=object).astype(str).str.removeprefix('TXN'), errors='coerce')
+        seqs = seqs.dropna().to_numpy(dtype=np.int64)
+        return seqs[(seqs >= 1) & (seqs <= self._n)] - 1
+
+    def get(self, txn_id):
+        rows = self._rows([txn_id])
+        if not len(rows):
+            return None
+        return self._page(rows).iloc[0].to_dict()
+
+    def set_status(self, txn_ids, status):
+        with self._lock:
+            self.status._intern([status])
+            self.status.codes[self._rows(txn_ids)] = self.status.code(status)
+
+    def set_status_where(self, status, **filters):
+        with self._lock:
+            rows = self._filter(**filters)
+            rows = slice(0, self._n) if rows is None else rows
+            self.status._intern([status])
+            self.status.codes[rows] = self.status.code(status)
+            return self._n if isinstance(rows, slice) else len(rows)
+
+    # Row indexes matching the TransactionStore query filters, None when nothing is filtered
+    def _filter(self, statuses=None, min_amount=None, max_amount=None, location="", upi=None):
+        if not statuses and min_amount is None and max_amount is None and not location and not upi:
+            return None
+        rows = slice(0, self._n)
+        mask = np.ones(self._n, dtype=bool)
+        if statuses:
+            mask &= self.status.test(lambda value: value in statuses, rows)
+        if min_amount is not None:
+            mask &= self.amount[rows] >= min_amount
+        if max_amount is not None:
+            mask &= self.amount[rows] <= max_amount
+        if location:
+            # Case-insensitive substring match, like the SQLite store's LIKE
+            needle = location.lower()
+            mask &= self.location.test(lambda value: needle in str(value).lower(), rows)
+        if upi:
+            code = self.upi.code(upi)
+            mask &= (self.upi.codes[rows] == code) & (code >= 0)
+        return np.flatnonzero(mask)
+
+    def count(self, **filters):
+        rows = self._filter(**filters)
+        return self._n if rows is None else len(rows)
+
+    def is_empty(self):
+        return self._n == 0
+
+    def last_seq(self):
+        return self._n
+
+    # Materialized string columns for a handful of rows
+    def _page(self, rows):
+        return pd.DataFrame({
+            'id': [txn_id(row + 1) for row in rows],
+            'status': [self.status.values[code] for code in self.status.codes[rows]],
+            'upi': [self.upi.values[code] for code in self.upi.codes[rows]],
+            'amount': self.amount[rows],
+            'location': [self.location.values[code] if code >= 0 else None for code in self.location.codes[rows]],
+            'payee': [self.payee.values[code] if code >= 0 else None for code in self.payee.codes[rows]],
+        }, columns=COLUMNS)
+
+    # Up to `limit` matching rows with seq above `after`, like TransactionStore.query
+    def query(self, after=0, limit=50, **filters):
+        rows = self._filter(**filters)
+        if rows is None:
+            rows = np.arange(min(after, self._n), min(after + limit, self._n))
+        else:
+            start = np.searchsorted(rows, after)
+            rows = rows[start:start + limit]
+        return self._page(rows).assign(seq=rows + 1)[['seq'] + COLUMNS]
+
+    # Rows [start, stop) as a DataFrame of views: integer seq, categorical string columns and
+    # float arrays. There is no id column; consumers format TXN ids only for rows they report.
+    def frame(self, start=0, stop=None):
+        stop = self._n if stop is None else min(stop, self._n)
+        start = min(start, stop)
+        return pd.DataFrame({
+            'seq': np.arange(start + 1, stop + 1, dtype=np.int64),
+            'status': self.status.view(start, stop),
+            'upi': self.upi.view(start, stop),
+            'handle': self.handle.view(start, stop),
+            'amount': self.amount[start:stop],
+            'location': self.location.view(start, stop),
+            'payee': self.payee.view(start, stop),
+            'created_at': self.created_at[start:stop],
+        }, copy=False)
+
+    def since(self, seq, limit=None):
+        return self.frame(seq, None if limit is None else seq + limit)
+
+    def between(self, start, end, limit=None):
+        rows = np.flatnonzero((self.created_at[:self._n] >= start) & (self.created_at[:self._n] < end))
+        return self._page(rows[:limit])
+
+    def by_upi(self, upi, limit=100):
+        return self.query(limit=limit, upi=upi)
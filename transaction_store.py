@@ -0,0 +1,231 @@
+import os
+import math
+import time
+import sqlite3
+import threading
+
+import pandas as pd
+
+# SQLite database shared by every session and dashboard
+TRANSACTIONS_DB = os.environ.get("TRANSACTIONS_DB", "transactions.db")
+
+# Filtered counts scan every matching row, so they are reused for this long (seconds) across
+# reruns and sessions; writes through the store drop them at once
+COUNT_TTL = float(os.environ.get("COUNT_TTL", "30"))
+COUNT_CACHE_SIZE = 256
+
+COLUMNS = ['id', 'status', 'upi', 'amount', 'location', 'payee']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    seq INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    status TEXT NOT NULL DEFAULT 'Pending',
+    upi TEXT NOT NULL,
+    amount NUMERIC,
+    location TEXT,
+    payee TEXT,
+    external_id TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_upi ON transactions(upi);
+CREATE INDEX IF NOT EXISTS idx_transactions_status ON transactions(status);
+CREATE INDEX IF NOT EXISTS idx_transactions_created_at ON transactions(created_at);
+"""
+
+# created_at is stored as epoch seconds; values outside 2000-2100 are a unit mistake
+# (milliseconds, microseconds) or garbage, and would corrupt every time-windowed feature
+MIN_CREATED_AT = 946_684_800.0
+MAX_CREATED_AT = 4_102_444_800.0
+
+# A finite float amount; raises ValueError for booleans, NaN, infinities and non-numbers
+def parse_amount(value):
+    if isinstance(value, bool):
+        raise ValueError(f"not a number: {value!r}")
+    amount = float(value)
+    if not math.isfinite(amount):
+        raise ValueError(f"not a finite number: {value!r}")
+    return amount
+
+# Epoch seconds from a number or an ISO 8601 date/time string; raises ValueError otherwise
+def parse_timestamp(value):
+    try:
+        ts = parse_amount(value)
+    except (TypeError, ValueError):
+        if not isinstance(value, str):
+            raise ValueError(f"not a timestamp: {value!r}")
+        ts = pd.Timestamp(value).timestamp()
+    if not MIN_CREATED_AT <= ts < MAX_CREATED_AT:
+        raise ValueError(f"not epoch seconds between 2000 and 2100: {value!r}")
+    return ts
+
+def txn_id(seq):
+    return f"TXN{seq}"
+
+# Next TXN id, computed inside the INSERT so concurrent sessions never collide
+NEXT_ID = "'TXN' || (SELECT COALESCE(MAX(seq), 0) + 1 FROM transactions)"
+
+def _where(statuses=None, min_amount=None, max_amount=None, location="", upi=None):
+    clauses = []
+    params = []
+    if statuses:
+        clauses.append(f"status IN ({', '.join('?' * len(statuses))})")
+        params.extend(statuses)
+    if min_amount is not None:
+        clauses.append("amount >= ?")
+        params.append(min_amount)
+    if max_amount is not None:
+        clauses.append("amount <= ?")
+        params.append(max_amount)
+    if location:
+        clauses.append("location LIKE ? ESCAPE '\\'")
+        escaped = location.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        params.append(f"%{escaped}%")
+    if upi:
+        clauses.append("upi = ?")
+        params.append(upi)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+# Durable transaction store: SQLite in WAL mode with indexes on id, UPI ID, status and time
+class TransactionStore:
+    def __init__(self, path=TRANSACTIONS_DB):
+        self.path = path
+        self._local = threading.local()
+        self._counts = {}
+        self._counts_lock = threading.Lock()
+        self.conn.executescript(SCHEMA)
+        # Databases created before payees or external ids were recorded gain the columns in place
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(transactions)")}
+        for column in ('payee', 'external_id'):
+            if column not in columns:
+                with self.conn as conn:
+                    conn.execute(f"ALTER TABLE transactions ADD COLUMN {column} TEXT")
+
+    @property
+    def conn(self):
+        # One connection per thread; WAL lets readers proceed while a session writes
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _frame(self, sql, params=(), columns=COLUMNS):
+        rows = self.conn.execute(sql, params).fetchall()
+        return pd.DataFrame.from_records(rows, columns=columns)
+
+    def _changed(self):
+        with self._counts_lock:
+            self._counts.clear()
+
+    def add(self, upi, amount=None, location=None, status='Pending', payee=None):
+        self._changed()
+        with self.conn as conn:
+            cur = conn.execute(
+                f"INSERT INTO transactions (id, status, upi, amount, location, payee, created_at) "
+                f"VALUES ({NEXT_ID}, ?, ?, ?, ?, ?, ?)",
+                (status, upi, amount, location, payee, time.time()),
+            )
+            return conn.execute("SELECT id FROM transactions WHERE seq = ?", (cur.lastrowid,)).fetchone()[0]
+
+    # Insert many transactions in one write transaction. Every record gets the next TXN id; an id
+    # supplied by the record (e.g. a feed's own id) is kept in external_id, so it can never clash.
+    def add_many(self, records):
+        self._changed()
+        now = time.time()
+        with self.conn as conn:
+            conn.executemany(
+                f"INSERT INTO transactions (id, status, upi, amount, location, payee, external_id, created_at) "
+                f"VALUES ({NEXT_ID}, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (r.get('status', 'Pending'), r['upi'], r.get('amount'), r.get('location'), r.get('payee'),
+                     None if r.get('id') is None else str(r['id']), r.get('created_at', now))
+                    for r in records
+                ),
+            )
+
+    def get(self, txn_id):
+        row = self.conn.execute(f"SELECT {', '.join(COLUMNS)} FROM transactions WHERE id = ?", (txn_id,)).fetchone()
+        return dict(zip(COLUMNS, row)) if row else None
+
+    def set_status(self, txn_ids, status):
+        self._changed()
+        with self.conn as conn:
+            conn.executemany("UPDATE transactions SET status = ? WHERE id = ?", ((status, txn_id) for txn_id in txn_ids))
+
+    def set_status_where(self, status, **filters):
+        self._changed()
+        where, params = _where(**filters)
+        with self.conn as conn:
+            return conn.execute(f"UPDATE transactions SET status = ?{where}", [status] + params).rowcount
+
+    # Rows matching the filters. Rows are never deleted, so the unfiltered count is the highest
+    # seq (one index probe); filtered counts come from the COUNT_TTL cache when they can.
+    def count(self, **filters):
+        where, params = _where(**filters)
+        if not where:
+            return self.last_seq()
+        key = (where, tuple(params))
+        now = time.monotonic()
+        with self._counts_lock:
+            cached = self._counts.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        total = self.conn.execute(f"SELECT COUNT(*) FROM transactions{where}", params).fetchone()[0]
+        with self._counts_lock:
+            if len(self._counts) >= COUNT_CACHE_SIZE:
+                self._counts.clear()
+            self._counts[key] = (now + COUNT_TTL, total)
+        return total
+
+    def is_empty(self):
+        return self.conn.execute("SELECT 1 FROM transactions LIMIT 1").fetchone() is None
+
+    def last_seq(self):
+        return self.conn.execute("SELECT COALESCE(MAX(seq), 0) FROM transactions").fetchone()[0]
+
+    # Keyset pagination: up to `limit` matching rows with seq above `after`, with their seq, so
+    # a page costs the same however deep it is (OFFSET would walk every skipped row)
+    def query(self, after=0, limit=50, **filters):
+        where, params = _where(**filters)
+        where = f"{where} AND seq > ?" if where else " WHERE seq > ?"
+        return self._frame(
+            f"SELECT seq, {', '.join(COLUMNS)} FROM transactions{where} ORDER BY seq LIMIT ?",
+            params + [after, limit],
+            ['seq'] + COLUMNS,
+        )
+
+    # Transactions added after a given sequence number, for incremental consumers
+    def since(self, seq, limit=None):
+        return self._frame(
+            f"SELECT seq, {', '.join(COLUMNS)}, created_at FROM transactions WHERE seq > ? ORDER BY seq LIMIT ?",
+            (seq, -1 if limit is None else limit),
+            ['seq'] + COLUMNS + ['created_at'],
+        )
+
+    def between(self, start, end, limit=None):
+        return self._frame(
+            f"SELECT {', '.join(COLUMNS)} FROM transactions WHERE created_at >= ? AND created_at < ? ORDER BY created_at LIMIT ?",
+            (start, end, -1 if limit is None else limit),
+        )
+
+    def by_upi(self, upi, limit=100):
+        return self.query(limit=limit, upi=upi)
+
+_store = None
+_store_lock = threading.Lock()
+
+# Process-wide transaction store; TRANSACTIONS_DB=:memory: keeps transactions in columnar arrays instead
+def get_transaction_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if TRANSACTIONS_DB == ':memory:':
+                    from transaction_columns import TransactionColumns
+                    _store = TransactionColumns()
+                else:
+                    _store = TransactionStore()
+    return _store
@@ -0,0 +1,67 @@
+import math
+
+import streamlit as st
+
+# Rows rendered per page of the transaction report
+PAGE_SIZE = 50
+
+STATUSES = ['Pending', 'Validated']
+
+def _filters(columns, key):
+    filters = {}
+    with st.expander("🔎 Filters"):
+        filters['statuses'] = st.multiselect("Status", STATUSES, key=f'{key}_status')
+        if 'amount' in columns:
+            col1, col2 = st.columns(2)
+            filters['min_amount'] = col1.number_input("Min Amount", min_value=0, value=None, step=1, key=f'{key}_min_amount')
+            filters['max_amount'] = col2.number_input("Max Amount", min_value=0, value=None, step=1, key=f'{key}_max_amount')
+        if 'location' in columns:
+            filters['location'] = st.text_input("Location contains", key=f'{key}_location')
+    return filters
+
+# Paginated transaction report: filters and paging run as indexed queries on the store,
+# only the visible page is rendered, and selected or filtered rows are validated in one action.
+# Pages are walked by keyset (the seq each page starts after, kept in session state), so a
+# deep page is as cheap as the first one.
+def render_transaction_table(store, columns, key="txn", page_size=PAGE_SIZE):
+    filters = _filters(columns, key)
+    total = store.count(**filters)
+
+    cursors_key = f'{key}_cursors'
+    signature = repr(sorted(filters.items()))
+    if st.session_state.get(f'{key}_filters') != signature:
+        # New filters: back to the first page
+        st.session_state[f'{key}_filters'] = signature
+        st.session_state[cursors_key] = [0]
+    cursors = st.session_state[cursors_key]
+    page = len(cursors)
+    rows = store.query(after=cursors[-1], limit=page_size + 1, **filters)
+    visible = rows.iloc[:page_size][columns]
+
+    pages = max(1, math.ceil(total / page_size))
+    col1, col2, col3 = st.columns([1, 1, 3])
+    if col1.button("⬅️ Previous", disabled=page == 1, key=f'{key}_previous'):
+        cursors.pop()
+        st.rerun()
+    if col2.button("Next ➡️", disabled=len(rows) <= page_size, key=f'{key}_next'):
+        cursors.append(int(rows['seq'].iat[page_size - 1]))
+        st.rerun()
+    col3.caption(f"{total} matching transactions · page {page} of {pages}")
+
+    event = st.dataframe(
+        visible,
+        width=700,
+        hide_index=True,
+        on_select="rerun",
+        selection_mode="multi-row",
+        key=f'{key}_grid_{page}',
+    )
+    selected = visible['id'].iloc[event.selection.rows].tolist()
+
+    col1, col2 = st.columns(2)
+    if col1.button(f"✅ Validate Selected ({len(selected)})", disabled=not selected, key=f'{key}_validate_selected'):
+        store.set_status(selected, 'Validated')
+        st.rerun()
+    if col2.button(f"✅ Validate All Filtered ({total})", disabled=total == 0, key=f'{key}_validate_filtered'):
+        store.set_status_where('Validated', **filters)
+        st.rerun()
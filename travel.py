@@ -0,0 +1,97 @@
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from gazetteer import get_gazetteer
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Faster than a commercial flight between two payments is treated as impossible
+MAX_SPEED_KMH = 900.0
+
+# Hops shorter than this are never flagged (neighbouring cities, coordinate rounding)
+MIN_DISTANCE_KM = 100.0
+
+# Most UPI IDs whose last known position is remembered, least recently seen evicted first
+MAX_KEYS = 1_000_000
+
+TRAVEL_COLUMNS = ['travel_km', 'travel_minutes', 'travel_speed_kmh', 'impossible_travel']
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=np.float64)) for a in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+# Impossible-travel check: each located transaction is compared with the previous located
+# transaction of the same UPI ID, from the same batch or carried over from earlier batches.
+# Pairs are formed with one sort per batch and the distances computed in one vectorized pass.
+class TravelTracker:
+    def __init__(self, max_keys=MAX_KEYS, max_speed_kmh=MAX_SPEED_KMH, min_distance_km=MIN_DISTANCE_KM):
+        self.max_keys = max_keys
+        self.max_speed_kmh = max_speed_kmh
+        self.min_distance_km = min_distance_km
+        # UPI ID -> (timestamp, lat, lon) of its latest located transaction
+        self.last = OrderedDict()
+
+    def __len__(self):
+        return len(self.last)
+
+    # Return the batch with travel columns added; rows without a known city get NaN/False
+    def observe(self, batch, now=None):
+        now = time.time() if now is None else now
+        n = len(batch)
+        columns = {
+            'travel_km': np.full(n, np.nan),
+            'travel_minutes': np.full(n, np.nan),
+            'travel_speed_kmh': np.full(n, np.nan),
+            'impossible_travel': np.zeros(n, dtype=bool),
+        }
+        if 'city_lat' not in batch:
+            if 'location' not in batch:
+                return batch.assign(**columns)
+            batch = get_gazetteer().annotate(batch)
+        lat = batch['city_lat'].to_numpy(dtype=np.float64)
+        rows = np.flatnonzero(~np.isnan(lat) & batch['upi'].notna().to_numpy())
+        if len(rows):
+            self._check(batch, rows, now, columns)
+        return batch.assign(**columns)
+
+    def _check(self, batch, rows, now, columns):
+        timestamps = batch['created_at'].to_numpy(dtype=np.float64)[rows] if 'created_at' in batch else np.full(len(rows), now)
+        lat = batch['city_lat'].to_numpy(dtype=np.float64)[rows]
+        lon = batch['city_lon'].to_numpy(dtype=np.float64)[rows]
+        codes, upis = pd.factorize(batch['upi'].to_numpy(dtype=object)[rows])
+        order = np.lexsort((timestamps, codes))
+        codes, timestamps, lat, lon, rows = codes[order], timestamps[order], lat[order], lon[order], rows[order]
+
+        # Previous position: the row before within the same UPI ID, or the carried-over state
+        first = np.ones(len(rows), dtype=bool)
+        first[1:] = codes[1:] != codes[:-1]
+        prev_ts = np.concatenate(([np.nan], timestamps[:-1]))
+        prev_lat = np.concatenate(([np.nan], lat[:-1]))
+        prev_lon = np.concatenate(([np.nan], lon[:-1]))
+        for i in np.flatnonzero(first):
+            prev_ts[i], prev_lat[i], prev_lon[i] = self.last.get(upis[codes[i]], (np.nan, np.nan, np.nan))
+
+        distance = haversine_km(prev_lat, prev_lon, lat, lon)
+        minutes = np.abs(timestamps - prev_ts) / 60
+        with np.errstate(divide='ignore', invalid='ignore'):
+            speed = np.where(distance > 0, distance / (minutes / 60), 0.0)
+        impossible = (distance >= self.min_distance_km) & (speed > self.max_speed_kmh)
+
+        columns['travel_km'][rows] = distance.round()
+        columns['travel_minutes'][rows] = minutes.round(1)
+        columns['travel_speed_kmh'][rows] = speed.round()
+        columns['impossible_travel'][rows] = impossible
+
+        # Carry each UPI ID's latest position over to the next batch
+        last = np.ones(len(rows), dtype=bool)
+        last[:-1] = codes[:-1] != codes[1:]
+        for i in np.flatnonzero(last):
+            upi = upis[codes[i]]
+            self.last[upi] = (timestamps[i], lat[i], lon[i])
+            self.last.move_to_end(upi)
+        while len(self.last) > self.max_keys:
+            self.last.popitem(last=False)
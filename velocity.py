@@ -0,0 +1,156 @@
+import time
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# One-minute buckets cover the 1 and 10 minute windows, ten-minute buckets cover the hour
+FINE_SECONDS = 60
+FINE_BUCKETS = 10
+COARSE_SECONDS = 600
+COARSE_BUCKETS = 6
+
+# Window name -> (bucket resolution, number of buckets summed)
+WINDOWS = {'1m': ('fine', 1), '10m': ('fine', 10), '60m': ('coarse', 6)}
+
+# Most UPI IDs tracked at once, and how long a key may stay idle before it is evicted
+MAX_KEYS = 1_000_000
+IDLE_SECONDS = 3600
+
+# Idle keys are swept at most this often (seconds of transaction time)
+EVICT_INTERVAL = 60
+
+FEATURE_COLUMNS = [f'{name}_{window}' for window in WINDOWS for name in ('txn_count', 'amount_sum', 'distinct_locations')]
+
+def location_bit(location):
+    # Locations hash into a 64-bit set, so distinct counts are exact until two cities collide
+    return np.uint64(1) << np.uint64(zlib.crc32(str(location).strip().lower().encode()) % 64)
+
+class _Buckets:
+    def __init__(self, capacity, buckets, seconds):
+        self.buckets = buckets
+        self.seconds = seconds
+        # Zero-filled arrays are only paged in as slots are used; epoch 0 is never live
+        self.epoch = np.zeros((capacity, buckets), dtype=np.int64)
+        self.count = np.zeros((capacity, buckets), dtype=np.int32)
+        self.amount = np.zeros((capacity, buckets), dtype=np.float64)
+        self.locations = np.zeros((capacity, buckets), dtype=np.uint64)
+
+    def add(self, slot, ts, amount, location):
+        epoch = int(ts // self.seconds)
+        i = epoch % self.buckets
+        if self.epoch[slot, i] != epoch:
+            # The bucket still holds an older period: recycle it
+            self.epoch[slot, i] = epoch
+            self.count[slot, i] = 0
+            self.amount[slot, i] = 0.0
+            self.locations[slot, i] = 0
+        self.count[slot, i] += 1
+        self.amount[slot, i] += amount
+        if location is not None:
+            self.locations[slot, i] |= location
+
+    def window(self, slots, ts, width):
+        current = (np.asarray(ts) // self.seconds).astype(np.int64)[:, None]
+        live = (self.epoch[slots] > current - width) & (self.epoch[slots] <= current)
+        counts = np.where(live, self.count[slots], 0).sum(axis=1)
+        amounts = np.where(live, self.amount[slots], 0.0).sum(axis=1)
+        masks = np.bitwise_or.reduce(np.where(live, self.locations[slots], np.uint64(0)), axis=1)
+        distinct = np.array([int(mask).bit_count() for mask in masks], dtype=np.int32)
+        return counts, amounts, distinct
+
+    def clear(self, slot):
+        self.epoch[slot] = 0
+
+# Per-UPI sliding-window velocity counters in fixed-size arrays with O(1) updates
+# and LRU eviction of idle keys, so memory is bounded by max_keys.
+class VelocityTracker:
+    def __init__(self, max_keys=MAX_KEYS, idle_seconds=IDLE_SECONDS):
+        self.max_keys = max_keys
+        self.idle_seconds = idle_seconds
+        self.slots = OrderedDict()
+        self.last_seen = np.zeros(max_keys, dtype=np.float64)
+        self._free = list(range(max_keys - 1, -1, -1))
+        self._fine = _Buckets(max_keys, FINE_BUCKETS, FINE_SECONDS)
+        self._coarse = _Buckets(max_keys, COARSE_BUCKETS, COARSE_SECONDS)
+        self.evictions = 0
+        self._next_sweep = -np.inf
+
+    def __len__(self):
+        return len(self.slots)
+
+    def _release(self, key):
+        slot = self.slots.pop(key)
+        self._fine.clear(slot)
+        self._coarse.clear(slot)
+        self._free.append(slot)
+        self.evictions += 1
+
+    def _slot(self, key):
+        slot = self.slots.get(key)
+        if slot is not None:
+            self.slots.move_to_end(key)
+            return slot
+        if not self._free:
+            # Full: reuse the least recently updated key
+            self._release(next(iter(self.slots)))
+        slot = self._free.pop()
+        self.slots[key] = slot
+        return slot
+
+    def update(self, upi, amount, location=None, ts=None):
+        ts = time.time() if ts is None else ts
+        slot = self._slot(upi)
+        bit = location_bit(location) if location is not None and location == location else None
+        self._fine.add(slot, ts, amount, bit)
+        self._coarse.add(slot, ts, amount, bit)
+        self.last_seen[slot] = max(self.last_seen[slot], ts)
+
+    def evict_idle(self, now=None):
+        cutoff = (time.time() if now is None else now) - self.idle_seconds
+        while self.slots:
+            key, slot = next(iter(self.slots.items()))
+            if self.last_seen[slot] >= cutoff:
+                break
+            self._release(key)
+
+    # Velocity features for each (upi, ts) pair; unknown UPI IDs get zeros
+    def features(self, upis, timestamps):
+        n = len(upis)
+        known = np.array([upi in self.slots for upi in upis], dtype=bool)
+        slots = np.array([self.slots.get(upi, 0) for upi in upis], dtype=np.int64)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        columns = {}
+        for window, (resolution, width) in WINDOWS.items():
+            buckets = self._fine if resolution == 'fine' else self._coarse
+            if n:
+                counts, amounts, distinct = buckets.window(slots, timestamps, width)
+            else:
+                counts, amounts, distinct = (np.zeros(0, dtype=np.int32), np.zeros(0), np.zeros(0, dtype=np.int32))
+            columns[f'txn_count_{window}'] = np.where(known, counts, 0)
+            columns[f'amount_sum_{window}'] = np.where(known, amounts, 0.0)
+            columns[f'distinct_locations_{window}'] = np.where(known, distinct, 0)
+        return pd.DataFrame(columns, columns=FEATURE_COLUMNS)
+
+    # Update the counters with a batch and return it with the velocity features as extra columns.
+    # Features are read after the whole batch is applied, i.e. as of the end of the micro-batch.
+    def observe(self, batch, now=None):
+        now = time.time() if now is None else now
+        timestamps = batch['created_at'].to_numpy(dtype=np.float64) if 'created_at' in batch else np.full(len(batch), now)
+        amounts = pd.to_numeric(batch['amount'], errors='coerce').fillna(0).to_numpy(dtype=np.float64) if 'amount' in batch else np.zeros(len(batch))
+        # Canonical cities when the batch has them, so "Bangalore" and "Bengaluru" count once
+        column = 'city' if 'city' in batch else 'location'
+        locations = batch[column].to_numpy() if column in batch else [None] * len(batch)
+        upis = batch['upi'].tolist()
+        for upi, amount, location, ts in zip(upis, amounts, locations, timestamps):
+            self.update(upi, amount, location, ts)
+        features = self.features(upis, timestamps)
+        features.index = batch.index
+        # Sweep by transaction time, so replays of old data age keys out the same way
+        latest = float(np.fmax.reduce(timestamps)) if len(timestamps) else now
+        latest = now if np.isnan(latest) else latest
+        if latest >= self._next_sweep:
+            self.evict_idle(latest)
+            self._next_sweep = latest + EVICT_INTERVAL
+        return pd.concat([batch, features], axis=1)